@@ -1,5 +1,6 @@
 from typing import Annotated
 
+import msgspec
 from pydantic import BaseModel, ConfigDict, StringConstraints
 
 
@@ -9,3 +10,7 @@ class APIBase(BaseModel):
     """Base for all API models."""
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Encoder for the msgspec structs of the read paths that skip pydantic
+json_encoder = msgspec.json.Encoder()
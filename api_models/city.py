@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 from pydantic import Field
 from api_models.base import APIBase, NonEmptyString
@@ -14,3 +15,21 @@ class CityRead(APIBase):
     id: UUID = Field(description="The unique identifier of the city")
     name: NonEmptyString = Field(description="The name of the city")
     population: int = Field(description="The population of the city")
+
+
+class CityStatsRead(APIBase):
+    city: NonEmptyString = Field(description="The name of the city")
+    city_population: int = Field(description="The population of the city")
+    museum_count: int = Field(description="The number of museums in the city")
+    museum_population_sum: int = Field(
+        description="The total annual number of visitors to the city's museums"
+    )
+    museum_population_avg: float | None = Field(
+        description="The average annual number of visitors per museum"
+    )
+    latest_predicted_visitors: int | None = Field(
+        description="The latest predicted number of visitors for the city"
+    )
+    latest_prediction_at: datetime | None = Field(
+        description="When the latest prediction was made"
+    )
@@ -1,5 +1,9 @@
+from datetime import datetime
+from enum import StrEnum
 from typing import Any
 from uuid import UUID
+
+import msgspec
 from pydantic import Field, field_validator
 from api_models.base import APIBase, NonEmptyString
 
@@ -23,3 +27,52 @@ class MuseumRead(APIBase):
         if hasattr(v, "name"):
             return v.name
         return v
+
+
+class MuseumCreated(MuseumRead):
+    prediction_task_id: str = Field(
+        description="The worker task predicting the museum's visitors"
+    )
+
+
+class PredictionStatus(StrEnum):
+    PENDING = "pending"
+    DONE = "done"
+
+
+class PredictionRead(APIBase):
+    museum_id: UUID = Field(description="The unique identifier of the museum")
+    status: PredictionStatus = Field(
+        description="`pending` until the worker has stored the prediction"
+    )
+    predicted_visitors: int | None = Field(
+        default=None, description="The predicted annual number of visitors"
+    )
+    predicted_at: datetime | None = Field(
+        default=None, description="When the prediction was made"
+    )
+
+
+class MuseumPage(APIBase):
+    items: list[MuseumRead] = Field(description="The museums of this page")
+    results_per_page: int = Field(description="The maximum number of museums per page")
+    cursor: UUID | None = Field(
+        description="Pass as `after` to get the next page, null on the last page"
+    )
+
+
+class MuseumRow(msgspec.Struct):
+    """Same JSON as `MuseumRead`, built from trusted database rows without
+    pydantic validation."""
+
+    id: UUID
+    city: str
+    population: int
+
+
+class MuseumRowPage(msgspec.Struct):
+    """Same JSON as `MuseumPage`."""
+
+    items: list[MuseumRow]
+    results_per_page: int
+    cursor: UUID | None
@@ -1,4 +1,6 @@
 from uuid import UUID
+
+import msgspec
 from pydantic import Field, EmailStr
 from api_models.base import APIBase, NonEmptyString
 
@@ -13,3 +15,13 @@ class ApiUserIn(APIBase):
 
 class ApiUserOut(ApiUserIn):
     id: UUID = Field(description="The unique identifier of the user")
+
+
+class UserRow(msgspec.Struct):
+    """Same JSON as `ApiUserOut`, built from trusted database rows without
+    pydantic validation."""
+
+    name: str
+    email: str
+    is_admin: bool
+    id: UUID
@@ -20,7 +20,7 @@ def test_create_and_list_museums(http_client):
     # Check that it appears in the list
     response = http_client.get("/museums")
     assert response.status_code == 200
-    museums = response.json()
+    museums = response.json()["items"]
     assert len(museums) == 1
     found = any(m["id"] == created["id"] for m in museums)
     assert found, f"Created museum {created['id']} not found in list"
@@ -1,86 +1,154 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any
 from uuid import UUID
 
 import uvicorn
 from litestar import Litestar
+from litestar.datastructures import State
 from litestar.di import Provide
-from litestar.middleware import DefineMiddleware
-from litestar.middleware.logging import LoggingMiddlewareConfig
-from advanced_alchemy.extensions.litestar import SQLAlchemyAsyncConfig, SQLAlchemyPlugin
-from litestar.exceptions import NotFoundException, PermissionDeniedException, NotAuthorizedException
+from advanced_alchemy.extensions.litestar import AsyncSessionConfig, SQLAlchemyPlugin
+from litestar.exceptions import (
+    HTTPException,
+    NotFoundException,
+    PermissionDeniedException,
+    NotAuthorizedException,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from taskiq_pg.psqlpy import PSQLPyBroker
 
+import metrics
+from caching.backends import CacheBackend, MemoryBackend, StoreBackend
+from caching.query_cache import QueryCache
 from clients.db_client import DBClient
+from clients.replicas import RoutingSession
+from clients.task_metrics import TaskMetricsMiddleware, sample_queue_depth
 from clients.worker_client import WorkerClient
+from controllers.city import CityController
 from controllers.health import HealthController
+from controllers.metrics import MetricsController
 from controllers.museum import MuseumController
 from controllers.user import UserController
-from middleware.request_id_middleware import RequestIDMiddleware
-from middleware.user_check_middleware import UserCheckMiddleware
+from middleware.server_timing_middleware import start_render_timing
+from middleware.stack import create_middleware_stack
 from exception_handlers import (
+    http_exception_handler,
     internal_server_error_handler,
     not_found_error_handler,
 )
 from settings import settings
-from orm.user import get_user
-from orm.models.user import User
+from api_models.user import ApiUserOut
+from orm.user import get_cached_user
+from readiness import Readiness
+from replica_routing import ReplicaRoutingConfig
 
-# Initialize DBClient at module level or pass it to Litestar state
-db_client = DBClient(db_url=settings.db_url)
-broker = PSQLPyBroker(url=settings.broker_url)
+# The one engine, and so the one pool, of the API process: shared by the
+# plugin's request sessions, guards, health checks and streams. Connecting is
+# lazy, the lifespan disposes of it.
+db_client = DBClient(
+    db_url=settings.db_url,
+    replica_urls=settings.DB_REPLICA_URLS,
+    replica_max_lag=settings.DB_REPLICA_MAX_LAG,
+)
+broker = PSQLPyBroker(dsn=settings.broker_url)
+broker.add_middlewares(TaskMetricsMiddleware())
 worker_client = WorkerClient(broker)
 
+
+def create_cache_backend() -> CacheBackend:
+    """Use the shared Redis cache when configured, else a per-process one."""
+    if settings.CACHE_REDIS_URL:
+        from litestar.stores.redis import RedisStore
+
+        return StoreBackend(RedisStore.with_client(url=settings.CACHE_REDIS_URL))
+    return MemoryBackend(maxsize=settings.CACHE_MAX_ENTRIES)
+
+
 @asynccontextmanager
 async def lifespan(app: Litestar):
     app.state.db_client = db_client
+    app.state.museum_cache = QueryCache(
+        create_cache_backend(), namespace="museums", ttl=settings.CACHE_TTL
+    )
+    metrics.instrument_engine(db_client.engine, "api")
+    for i, replica in enumerate(db_client.replicas.replicas):
+        metrics.instrument_engine(replica.engine, f"replica-{i}")
+        metrics.db_replica_lag.set_function(lambda r=replica: r.lag, f"replica-{i}")
     await worker_client.startup()
     app.state.worker_client = worker_client
+    app.state.readiness = Readiness(
+        db_client, worker_client, interval=settings.READINESS_INTERVAL
+    )
+    background_tasks = [
+        asyncio.create_task(app.state.readiness.run()),
+        asyncio.create_task(db_client.replicas.run(settings.DB_REPLICA_LAG_INTERVAL)),
+        asyncio.create_task(
+            sample_queue_depth(broker, settings.METRICS_QUEUE_SAMPLE_INTERVAL)
+        ),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
     await worker_client.shutdown()
     await db_client.close()
 
 
 # Database Configuration
-db_config = SQLAlchemyAsyncConfig(
-    connection_string=settings.db_url,
+db_config = ReplicaRoutingConfig(
+    engine_instance=db_client.engine,
+    session_config=AsyncSessionConfig(sync_session_class=RoutingSession),
+    replicas=db_client.replicas,
     create_all=False,  # managed by alembic
     before_send_handler="autocommit",
 )
 
+
 async def provide_user_id(scope: dict[str, Any]) -> UUID:
     user_id = scope.get("user_id")
     if not user_id:
         raise NotAuthorizedException(detail="Missing or invalid X-User-ID header")
     return user_id
 
-async def provide_user(db_session: AsyncSession, user_id: UUID) -> User:
-    user = await get_user(db_session, user_id)
+
+async def provide_user(db_session: AsyncSession, current_user_id: UUID) -> ApiUserOut:
+    user = await get_cached_user(db_session, current_user_id)
     if not user:
         raise PermissionDeniedException(detail="User not found")
     return user
 
-async def provide_worker_client(scope: dict[str, Any]) -> WorkerClient:
-    return scope["state"]["worker_client"]
+
+async def provide_worker_client(state: State) -> WorkerClient:
+    return state.worker_client
+
+
+async def provide_museum_cache(state: State) -> QueryCache:
+    return state.museum_cache
+
 
 # App
 app = Litestar(
-    route_handlers=[MuseumController, HealthController, UserController],
+    route_handlers=[
+        MuseumController,
+        CityController,
+        HealthController,
+        MetricsController,
+        UserController,
+    ],
     plugins=[SQLAlchemyPlugin(config=db_config)],
     lifespan=[lifespan],
-    middleware=[
-        LoggingMiddlewareConfig().middleware,
-        DefineMiddleware(RequestIDMiddleware),
-        DefineMiddleware(UserCheckMiddleware),
-    ],
+    middleware=create_middleware_stack(server_timing=settings.SERVER_TIMING),
+    after_request=start_render_timing if settings.SERVER_TIMING else None,
     dependencies={
-        "user_id": Provide(provide_user_id),
+        # Not `user_id`, which routes use as a path and query parameter
+        "current_user_id": Provide(provide_user_id),
         "user": Provide(provide_user),
         "worker_client": Provide(provide_worker_client),
+        "museum_cache": Provide(provide_museum_cache),
     },
     exception_handlers={
         Exception: internal_server_error_handler,
+        HTTPException: http_exception_handler,
         NotFoundException: not_found_error_handler,
     },
 )
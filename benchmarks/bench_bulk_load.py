@@ -0,0 +1,75 @@
+"""Museums per second of the data pipeline's load paths.
+
+    uv run python -m benchmarks.bench_bulk_load [--museums N] [--cities N]
+
+Loads `--museums` museums spread over `--cities` cities into the configured
+database, once with `create_museum` per row like the pipeline used to and once
+with the COPY bulk loader. Each load runs in a transaction that is rolled
+back, so the database is left as it was.
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api_models.museum import MuseumCreate
+from orm import bulk_load
+from orm import museum as museum_repo
+from settings import Settings
+
+
+async def per_row(session: AsyncSession, rows: list[tuple[str, int]]) -> None:
+    user_id = uuid4()
+    for city, population in rows:
+        await museum_repo.create_museum(
+            session, MuseumCreate(city=city, population=population), user_id
+        )
+
+
+async def bulk(session: AsyncSession, rows: list[tuple[str, int]]) -> None:
+    await bulk_load.load_museums(session, rows, uuid4())
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    settings = Settings()
+    engine = create_async_engine(settings.db_url, **settings.engine_options)
+    # Unique names, so no city is served from the id cache of a previous load
+    run = uuid4().hex[:8]
+    rows = [
+        (f"bench-{run}-{i % args.cities}", 100_000 + i % args.cities)
+        for i in range(args.museums)
+    ]
+
+    paths = [("bulk", bulk)]
+    if not args.skip_per_row:
+        paths.insert(0, ("per-row", per_row))
+    for name, load in paths:
+        async with AsyncSession(engine) as session:
+            await session.begin()
+            start = time.perf_counter()
+            await load(session, rows)
+            await session.flush()
+            seconds = time.perf_counter() - start
+            await session.rollback()
+        print(f"{name:<8} {args.museums / seconds:>12,.0f} museums/s  ({seconds:.2f}s)")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--museums", type=int, default=10_000)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument(
+        "--skip-per-row", action="store_true", help="Only time the bulk loader"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Predictions per second of per-call and micro-batched ONNX inference.
+
+    uv run python -m benchmarks.bench_inference [--model PATH] [--concurrency 1 16 64]
+
+`--concurrency` tasks each ask for predictions in a loop for `--duration`
+seconds, like worker tasks do. The per-call path runs the model once per
+prediction, the batched path goes through the worker's `BatchPredictor`.
+Without a model at `--model`, one is trained on synthetic data first.
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+from onnxruntime import InferenceSession
+
+from data_science.onnx_train_predict import train_model
+from inference import BatchPredictor, load_session
+
+
+def load_or_train_session(model_path: Path, **options) -> InferenceSession:
+    """The model at `model_path`, or one trained on synthetic data."""
+    if model_path.exists():
+        return load_session(model_path, **options)
+
+    populations = [random.randint(200_001, 20_000_000) for _ in range(100)]
+    df = pl.DataFrame(
+        {
+            "population": populations,
+            "avg_museum_visitors_per_year": [p // 10 for p in populations],
+        }
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.onnx"
+        train_model(df, path.with_suffix(".joblib"), path, dump_sklearn=False)
+        return load_session(path, **options)
+
+
+async def per_call(session: InferenceSession, population: int) -> float:
+    x_input = np.array([[population]], dtype=np.int64)
+    [output] = session.run(None, {"population": x_input})
+    return float(np.asarray(output)[0][0])
+
+
+async def run_client(predict, deadline: float, stats: dict) -> None:
+    while time.perf_counter() < deadline:
+        await predict(random.randint(200_001, 20_000_000))
+        stats["predictions"] += 1
+        # Let the other tasks run, as the DB I/O of a real task would
+        await asyncio.sleep(0)
+
+
+async def measure(name: str, predict, concurrency: int, duration: float) -> None:
+    stats = {"predictions": 0}
+    deadline = time.perf_counter() + duration
+    async with asyncio.TaskGroup() as group:
+        for _ in range(concurrency):
+            group.create_task(run_client(predict, deadline, stats))
+    print(
+        f"{name:<8} concurrency {concurrency:>4}:"
+        f" {stats['predictions'] / duration:>10,.0f} predictions/s"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    session = load_or_train_session(args.model)
+    predictor = BatchPredictor(
+        session, max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000
+    )
+
+    async def per_call_predict(population: int) -> float:
+        return await per_call(session, population)
+
+    for concurrency in args.concurrency:
+        await measure("per-call", per_call_predict, concurrency, args.duration)
+        await measure("batched", predictor.predict, concurrency, args.duration)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", type=Path, default=Path("cache/model.onnx"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
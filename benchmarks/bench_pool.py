@@ -0,0 +1,105 @@
+"""Throughput of the configured database against the connection pool size.
+
+    uv run python -m benchmarks.bench_pool [--sizes 2 5 10 20] [--concurrency N]
+
+`--concurrency` tasks run short queries in a loop for `--duration` seconds,
+each holding a pooled connection for the query like a request handler does.
+Each pool size gets a fresh engine without overflow, so the pool size is the
+number of connections. A pool smaller than the concurrency shows up as lower
+throughput, a higher p99 wait for a connection, and `QueuePool limit`
+timeouts once a wait exceeds `--pool-timeout`.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from settings import Settings
+
+
+async def run_client(
+    engine: AsyncEngine, deadline: float, query_seconds: float, stats: dict
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                stats["waits"].append(time.perf_counter() - start)
+                await conn.execute(
+                    text("SELECT 1 FROM pg_sleep(:s)"), {"s": query_seconds}
+                )
+        except exc.TimeoutError:
+            stats["timeouts"] += 1
+        else:
+            stats["queries"] += 1
+
+
+async def hold_connection(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await asyncio.sleep(0.1)
+
+
+async def measure(
+    db_url: str, options: dict, pool_size: int, args: argparse.Namespace
+) -> None:
+    engine = create_async_engine(
+        db_url,
+        **options
+        | {
+            "pool_size": pool_size,
+            "max_overflow": 0,
+            "pool_timeout": args.pool_timeout,
+        },
+    )
+    # Open the connections up front, connecting is not what is measured
+    async with asyncio.TaskGroup() as group:
+        for _ in range(pool_size):
+            group.create_task(hold_connection(engine))
+
+    stats = {"queries": 0, "timeouts": 0, "waits": []}
+    deadline = time.perf_counter() + args.duration
+    async with asyncio.TaskGroup() as group:
+        for _ in range(args.concurrency):
+            group.create_task(run_client(engine, deadline, args.query_ms / 1000, stats))
+    await engine.dispose()
+
+    waits = sorted(stats["waits"])
+    p99 = waits[int(len(waits) * 0.99)] if waits else 0.0
+    print(
+        f"pool {pool_size:>3}: {stats['queries'] / args.duration:>8,.0f} queries/s"
+        f"  wait p50 {statistics.median(waits or [0]) * 1000:>7.1f}ms"
+        f"  p99 {p99 * 1000:>7.1f}ms  timeouts {stats['timeouts']}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    settings = Settings()
+    print(
+        f"{args.concurrency} concurrent clients, {args.query_ms}ms queries,"
+        f" {args.duration}s per pool size"
+    )
+    for pool_size in args.sizes:
+        await measure(settings.db_url, settings.engine_options, pool_size, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument(
+        "--query-ms", type=float, default=5.0, help="Time a query holds its connection"
+    )
+    parser.add_argument("--pool-timeout", type=float, default=1.0)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
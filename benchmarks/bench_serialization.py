@@ -0,0 +1,104 @@
+"""Rows per second of the museum list serialization paths.
+
+    uv run python -m benchmarks.bench_serialization [--rows N] [--db]
+
+Without `--db` both paths serialize in-memory rows, which isolates the CPU cost
+of serialization. With `--db` they read the first `--rows` museums of the
+configured database instead, including the ORM loading the pydantic path needs.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, Sequence
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api_models.base import json_encoder
+from api_models.museum import MuseumPage, MuseumRead, MuseumRow, MuseumRowPage
+from orm import museum as museum_repo
+from orm.models.city import City
+from orm.models.museum import Museum
+from settings import Settings
+
+
+def pydantic_path(museums: Sequence[Museum]) -> bytes:
+    """What the list endpoint did before: validate each ORM object."""
+    items = [MuseumRead.model_validate(m) for m in museums]
+    page = MuseumPage(items=items, results_per_page=len(items), cursor=None)
+    return page.model_dump_json().encode()
+
+
+def row_path(rows: Sequence[Sequence[Any]]) -> bytes:
+    items = [MuseumRow(*row) for row in rows]
+    page = MuseumRowPage(items=items, results_per_page=len(items), cursor=None)
+    return json_encoder.encode(page)
+
+
+def report(name: str, rows: int, seconds: float) -> None:
+    print(
+        f"{name:<10} {rows / seconds:>14,.0f} rows/s  ({seconds * 1000:.1f} ms per page)"
+    )
+
+
+def measure(name: str, rows: int, run: Callable[[], object], repeat: int) -> None:
+    report(name, rows, min(_timed(run) for _ in range(repeat)))
+
+
+def _timed(run: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def in_memory(rows: int, repeat: int) -> None:
+    cities = [City(id=uuid4(), name=f"City {i}", population=i) for i in range(100)]
+    museums = [
+        Museum(id=uuid4(), city=cities[i % 100], population=i) for i in range(rows)
+    ]
+    tuples = [(m.id, m.city.name, m.population) for m in museums]
+    assert pydantic_path(museums) == row_path(tuples)
+
+    measure("pydantic", rows, lambda: pydantic_path(museums), repeat)
+    measure("rows", rows, lambda: row_path(tuples), repeat)
+
+
+async def from_db(rows: int, repeat: int) -> None:
+    engine = create_async_engine(Settings().db_url)
+
+    async def pydantic_page(session: AsyncSession) -> bytes:
+        return pydantic_path(await museum_repo.list_museums(session, limit=rows))
+
+    async def row_page(session: AsyncSession) -> bytes:
+        return row_path(await museum_repo.list_museum_rows(session, limit=rows))
+
+    async with AsyncSession(engine) as session:
+        found = len(await museum_repo.list_museum_rows(session, limit=rows))
+
+    for name, load in (("pydantic", pydantic_page), ("rows", row_page)):
+        timings = []
+        for _ in range(repeat):
+            async with AsyncSession(engine) as session:
+                start = time.perf_counter()
+                await load(session)
+                timings.append(time.perf_counter() - start)
+        report(name, found, min(timings))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", action="store_true", help="Read from the database")
+    args = parser.parse_args()
+
+    if args.db:
+        asyncio.run(from_db(args.rows, args.repeat))
+    else:
+        in_memory(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
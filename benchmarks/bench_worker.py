@@ -0,0 +1,108 @@
+"""Task throughput of the worker as its concurrency rises.
+
+    uv run python -m benchmarks.bench_worker [--concurrency 1 8 32 128] [--threads 1]
+
+Each simulated task waits `--io-ms` for its reads, gets a prediction, then
+waits `--io-ms` for its writes, like `log_museum_created`. The waits stand in
+for database round trips, so only the inference path differs between runs:
+on the event loop, or on an executor of `--threads` threads. While the tasks
+run, a probe measures how late the event loop wakes it up (loop lag), which is
+the delay inference adds to every other task's I/O.
+
+The ONNX options come from the settings (`ONNX_*`), e.g.
+
+    ONNX_INTRA_OP_NUM_THREADS=1 uv run python -m benchmarks.bench_worker
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from benchmarks.bench_inference import load_or_train_session
+from inference import BatchPredictor
+from settings import Settings
+
+PROBE_INTERVAL = 0.001
+
+
+async def run_task(predictor: BatchPredictor, io_seconds: float) -> None:
+    await asyncio.sleep(io_seconds)
+    await predictor.predict(random.randint(200_001, 20_000_000))
+    await asyncio.sleep(io_seconds)
+
+
+async def run_client(
+    predictor: BatchPredictor, io_seconds: float, deadline: float, stats: dict
+) -> None:
+    while time.perf_counter() < deadline:
+        await run_task(predictor, io_seconds)
+        stats["tasks"] += 1
+
+
+async def probe_loop_lag(deadline: float, lags: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def measure(
+    name: str, predictor: BatchPredictor, concurrency: int, args: argparse.Namespace
+) -> None:
+    stats = {"tasks": 0}
+    lags: list[float] = []
+    deadline = time.perf_counter() + args.duration
+    async with asyncio.TaskGroup() as group:
+        group.create_task(probe_loop_lag(deadline, lags))
+        for _ in range(concurrency):
+            group.create_task(run_client(predictor, args.io_ms / 1000, deadline, stats))
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"{name:<9} concurrency {concurrency:>4}:"
+        f" {stats['tasks'] / args.duration:>9,.0f} tasks/s"
+        f"  loop lag p99 {p99 * 1000:>6.2f}ms"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    settings = Settings()
+    session = load_or_train_session(args.model, **settings.onnx_session_options)
+    predictor = partial(
+        BatchPredictor,
+        session,
+        max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+        max_wait=settings.INFERENCE_MAX_WAIT_MS / 1000,
+    )
+    executor = ThreadPoolExecutor(
+        max_workers=args.threads, thread_name_prefix="inference"
+    )
+    on_loop = predictor()
+    on_executor = predictor(executor=executor)
+
+    print(f"{args.io_ms}ms of I/O per task, inference threads: {args.threads}")
+    for concurrency in args.concurrency:
+        await measure("loop", on_loop, concurrency, args)
+        await measure("executor", on_executor, concurrency, args)
+    executor.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", type=Path, default=Path("cache/model.onnx"))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--io-ms", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Key/value backends for the query cache."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from litestar.stores.base import Store
+
+from caching.lru import LRUCache
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+@dataclass
+class MemoryBackend:
+    """Per-process backend, bounded in size with LRU eviction."""
+
+    maxsize: int
+    _entries: LRUCache[str, tuple[float, bytes]] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._entries = LRUCache(maxsize=self.maxsize)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.delete(key)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries.set(key, (time.monotonic() + ttl, value))
+
+    async def delete(self, key: str) -> None:
+        self._entries.delete(key)
+
+
+@dataclass
+class StoreBackend:
+    """Shared backend on top of any Litestar store, e.g. a `RedisStore`.
+
+    Size bounds and eviction are left to the store (`maxmemory` for Redis).
+    """
+
+    store: Store
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.store.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.store.set(key, value, expires_in=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.store.delete(key)
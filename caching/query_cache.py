@@ -0,0 +1,103 @@
+"""Read-through cache for serialized query results."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, overload
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from caching.backends import CacheBackend
+
+# Lifetime of a namespace version, well above any entry TTL. Losing it early
+# only costs a round of cache misses.
+VERSION_TTL = 24 * 60 * 60
+
+_PENDING_INVALIDATIONS = "pending_cache_invalidations"
+
+
+@dataclass(eq=False)
+class QueryCache:
+    """Read-through cache of serialized results under a namespace.
+
+    Entries are stored under the current version of the namespace. Invalidating
+    swaps the version for a new random one, which drops every entry at once on
+    any backend without listing keys. A reader that loaded rows before a write
+    committed stores them under the old version, where they are never read.
+    """
+
+    backend: CacheBackend
+    namespace: str
+    ttl: int = 30
+    _invalidations: set[asyncio.Task] = field(default_factory=set, init=False)
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.namespace}:version"
+
+    async def _version(self) -> bytes:
+        version = await self.backend.get(self._version_key)
+        if version is None:
+            version = uuid4().hex.encode()
+            await self.backend.set(self._version_key, version, VERSION_TTL)
+        return version
+
+    @overload
+    async def get_or_set(
+        self, key: str, loader: Callable[[], Awaitable[bytes]]
+    ) -> bytes: ...
+
+    @overload
+    async def get_or_set(
+        self, key: str, loader: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None: ...
+
+    async def get_or_set(
+        self, key: str, loader: Callable[[], Awaitable[bytes | None]]
+    ) -> bytes | None:
+        """Return the cached value for `key`, calling `loader` on a miss.
+
+        A `None` from the loader (e.g. not found) is returned but not cached.
+        """
+        if self._invalidations:
+            # Never read past a commit whose invalidation is still in flight
+            await asyncio.gather(*self._invalidations)
+
+        version = await self._version()
+        entry_key = f"{self.namespace}:{version.decode()}:{key}"
+        value = await self.backend.get(entry_key)
+        if value is None:
+            value = await loader()
+            if value is not None:
+                await self.backend.set(entry_key, value, self.ttl)
+        return value
+
+    async def invalidate(self) -> None:
+        await self.backend.set(self._version_key, uuid4().hex.encode(), VERSION_TTL)
+
+    def invalidate_on_commit(self, session: AsyncSession) -> None:
+        """Invalidate the namespace once the session's transaction commits.
+
+        Invalidating before the commit would let a concurrent reader cache the
+        pre-commit rows again under the new version.
+        """
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(self)
+
+    def _schedule_invalidation(self) -> None:
+        task = asyncio.get_running_loop().create_task(self.invalidate())
+        self._invalidations.add(task)
+        task.add_done_callback(self._invalidations.discard)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    # Commit events are synchronous, the backends are not
+    for cache in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        cache._schedule_invalidation()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
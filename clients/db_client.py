@@ -2,27 +2,39 @@ import asyncio
 import logging
 from dataclasses import dataclass, field
 from functools import wraps
+from typing import Any
 
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy import text, select
-from sqlalchemy import create_engine
 
+from clients.db_health import DBHealth
+from clients.replicas import Replica, ReplicaSet
 from orm.models.base import Base
 from orm.models.user import User
+from settings import settings
 
 logger = logging.getLogger(__name__)
 
+ALEMBIC_CONFIG = "alembic.ini"
 
-def ensure_db_ready(func):
+
+def _load_head_revision() -> str | None:
+    script = ScriptDirectory.from_config(Config(ALEMBIC_CONFIG))
+    return script.get_current_head()
+
+
+def require_db(func):
     """
-    Decorator to ensure the database is ready before executing the method.
-    It calls wait_for_db on the instance.
+    Decorator failing fast with `DatabaseUnavailableError` while the database
+    is known to be down. Costs no round trip, see `DBHealth`.
     """
 
     @wraps(func)
     async def wrapper(self, *args, **kwargs):
-        # Avoid infinite recursion if ensuring ready on wait_for_db itself (not needed there)
-        await self.wait_for_db(self.wait_timeout)
+        self.health.raise_if_down()
         return await func(self, *args, **kwargs)
 
     return wrapper
@@ -32,13 +44,31 @@ def ensure_db_ready(func):
 class DBClient:
     db_url: str
     engine: AsyncEngine = field(init=False)
-    wait_timeout: int = 5
+    health: DBHealth = field(init=False)
+    head_revision: str | None = field(default=None, init=False)
+    engine_options: dict[str, Any] = field(
+        default_factory=lambda: settings.engine_options
+    )
+    replica_urls: list[str] = field(default_factory=list)
+    replica_max_lag: float = 5.0
+    replicas: ReplicaSet = field(init=False)
 
     def __post_init__(self):
-        self.engine = create_async_engine(self.db_url)
+        self.engine = create_async_engine(self.db_url, **self.engine_options)
+        self.health = DBHealth(self.engine)
+        replicas = []
+        for url in self.replica_urls:
+            engine = create_async_engine(url, **self.engine_options)
+            replicas.append(Replica(engine, DBHealth(engine)))
+        self.replicas = ReplicaSet(self.engine, replicas, self.replica_max_lag)
         logger.info("DBClient engine initialized.")
 
+    def read_engine(self) -> AsyncEngine:
+        """Engine to read from: a replica in turn, or the primary."""
+        return self.replicas.read_engine()
+
     async def wait_for_db(self, timeout: int = 5) -> None:
+        """Wait for the database to accept connections, e.g. on startup."""
         start_time = asyncio.get_running_loop().time()
 
         while True:
@@ -55,18 +85,20 @@ class DBClient:
                 await asyncio.sleep(0.5)
 
     async def close(self) -> None:
+        await self.replicas.close()
+        await self.health.close()
         if self.engine:
             await self.engine.dispose()
             logger.info("DBClient engine disposed.")
 
-    @ensure_db_ready
+    @require_db
     async def clear_db(self) -> None:
         async with self.engine.begin() as conn:
             await conn.execute(text("DROP SCHEMA public CASCADE;"))
             await conn.execute(text("CREATE SCHEMA public;"))
         logger.info("Database schema dropped and recreated.")
 
-    @ensure_db_ready
+    @require_db
     async def create_all(self) -> None:
         """Create all tables. Used for testing."""
         metadata = Base.metadata
@@ -74,36 +106,32 @@ class DBClient:
             await conn.run_sync(metadata.create_all)
             logger.info("Tables created.")
 
-    # check_migrations uses a sync engine internally and manages its own connection,
-    # so we might not strictly need the async wait here, but it's good practice to ensure DB is up.
-    # However, since check_migrations creates a separate sync engine, waiting on the async engine
-    # ensures the server is reachable.
-    @ensure_db_ready
-    async def check_migrations(self) -> bool:
-        from alembic import config
-        from alembic.runtime import migration
-        from alembic.script import ScriptDirectory
-
-        sync_url = self.db_url.replace("+asyncpg", "")
-
-        def _check_sync():
-            engine = create_engine(sync_url)
-            try:
-                alembic_cfg = config.Config("alembic.ini")
-                script = ScriptDirectory.from_config(alembic_cfg)
-
-                with engine.connect() as conn:
-                    context = migration.MigrationContext.configure(conn)
-                    current_rev = context.get_current_revision()
-                    head_rev = script.get_current_head()
+    async def get_head_revision(self) -> str | None:
+        """Alembic head revision of the code, read from disk on first use only."""
+        if self.head_revision is None:
+            self.head_revision = await asyncio.to_thread(_load_head_revision)
+        return self.head_revision
+
+    async def get_current_revision(self) -> str | None:
+        """Revision the database is migrated to, `None` if it never was."""
+        async with self.engine.connect() as conn:
+            return await conn.run_sync(
+                lambda sync_conn: MigrationContext.configure(
+                    sync_conn
+                ).get_current_revision()
+            )
 
-                    return current_rev == head_rev
-            finally:
-                engine.dispose()
+    @require_db
+    async def check_migrations(self) -> bool:
+        """Whether the database is at the head revision.
 
-        return await asyncio.to_thread(_check_sync)
+        Reads the version table through the pooled engine. Raises if the
+        database is unreachable, without waiting for it to come back.
+        """
+        head_revision = await self.get_head_revision()
+        return await self.get_current_revision() == head_revision
 
-    @ensure_db_ready
+    @require_db
     async def seed_db(self) -> None:
         """Seeds the database with an initial user."""
         try:
@@ -0,0 +1,117 @@
+"""Shared view of whether the database is reachable, as a circuit breaker."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Consecutive connection failures before the database is considered down
+FAILURE_THRESHOLD = 3
+# Seconds between two probes while the database is not healthy
+PROBE_INTERVAL = 1.0
+
+
+class DBState(StrEnum):
+    HEALTHY = "healthy"
+    # Recent connection failures, calls still go through
+    DEGRADED = "degraded"
+    # Calls fail fast until a probe reaches the database again
+    DOWN = "down"
+
+
+class DatabaseUnavailableError(ConnectionError):
+    """The database is known to be down, the call was not attempted."""
+
+
+@dataclass(eq=False)
+class DBHealth:
+    """Health of the database behind an engine.
+
+    Real queries update it for free: a connection error counts as a failure,
+    any executed statement as a success. From the first failure on, a single
+    background task probes the database every `probe_interval` seconds until it
+    answers again. After `failure_threshold` failures in a row the circuit
+    opens: callers checking `raise_if_down` fail at once, without waiting on a
+    connection timeout.
+    """
+
+    engine: AsyncEngine
+    failure_threshold: int = FAILURE_THRESHOLD
+    probe_interval: float = PROBE_INTERVAL
+    state: DBState = field(default=DBState.HEALTHY, init=False)
+    failures: int = field(default=0, init=False)
+    _prober: asyncio.Task | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "handle_error", self._on_error)
+        event.listen(sync_engine, "after_cursor_execute", self._on_execute)
+
+    def raise_if_down(self) -> None:
+        if self.state is DBState.DOWN:
+            raise DatabaseUnavailableError("Database is down, waiting for a probe")
+
+    def record_success(self) -> None:
+        if self.state is not DBState.HEALTHY:
+            logger.info(f"Database is healthy again after {self.failures} failures")
+        self.state = DBState.HEALTHY
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            state = DBState.DOWN
+        else:
+            state = DBState.DEGRADED
+        if state is not self.state:
+            logger.warning(f"Database is {state} after {self.failures} failures")
+        self.state = state
+        self._start_prober()
+
+    async def probe(self) -> bool:
+        """Try a `SELECT 1`, the outcome is recorded by the engine listeners."""
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except exc.DBAPIError:
+            return False
+        return True
+
+    def _start_prober(self) -> None:
+        if self._prober is not None and not self._prober.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of an event loop, the next call or probe will tell
+            return
+        self._prober = loop.create_task(self._probe_until_healthy())
+
+    async def _probe_until_healthy(self) -> None:
+        while self.state is not DBState.HEALTHY:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe()
+
+    async def close(self) -> None:
+        if self._prober is not None:
+            self._prober.cancel()
+            await asyncio.gather(self._prober, return_exceptions=True)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        # Errors of the connection itself, not of the statement (e.g. a constraint)
+        if context.is_disconnect or isinstance(
+            context.sqlalchemy_exception, (exc.InterfaceError, exc.OperationalError)
+        ):
+            self.record_failure()
+
+    def _on_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if self.failures:
+            self.record_success()
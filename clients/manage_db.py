@@ -2,9 +2,12 @@ import argparse
 import asyncio
 import logging
 import sys
+from pathlib import Path
+from uuid import UUID
 
 from app import settings
 from clients.db_client import DBClient
+from clients.museum_import import DEFAULT_BATCH_SIZE, READERS, import_museums
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +33,26 @@ async def main():
     # Command: wait
     subparsers.add_parser("wait", help="Wait for database to be ready")
 
+    # Command: load
+    load_parser = subparsers.add_parser(
+        "load", help="Load museums from a JSONL, CSV or Parquet file"
+    )
+    load_parser.add_argument(
+        "path", type=Path, help="File with `city` and `population` fields"
+    )
+    load_parser.add_argument(
+        "--user-id", type=UUID, required=True, help="Owner of the loaded museums"
+    )
+    load_parser.add_argument(
+        "--format", choices=READERS, help="Defaults to the file extension"
+    )
+    load_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    load_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of a previous load of the file",
+    )
+
     args = parser.parse_args()
 
     # Manually create client
@@ -45,6 +68,21 @@ async def main():
         elif args.command == "seed":
             logger.info("Seeding database...")
             await client.seed_db()
+        elif args.command == "load":
+            logger.info(f"Loading {args.path}...")
+            report = await import_museums(
+                client.engine,
+                args.path,
+                args.user_id,
+                file_format=args.format,
+                batch_size=args.batch_size,
+                restart=args.restart,
+            )
+            logger.info(
+                f"Loaded {report.rows} rows in {report.seconds:.1f}s "
+                f"({report.rows_per_second:,.0f} rows/s), "
+                f"{report.total_rows} from this file in total"
+            )
         elif args.command == "wait":
             logger.info("Waiting for database...")
             await client.wait_for_db()
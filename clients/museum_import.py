@@ -0,0 +1,185 @@
+"""Streaming import of museum dumps (JSONL, CSV, Parquet) through `COPY`.
+
+The file is read in batches of `batch_size` rows, each loaded in its own
+transaction with the checkpoint of the load, so memory doesn't depend on the
+file size and a crashed load resumes after the last committed batch.
+"""
+
+import csv
+import json
+import logging
+import time
+from dataclasses import dataclass
+from itertools import batched
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from uuid import UUID
+
+import polars as pl
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from orm import bulk_load
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50_000
+# Rows read from a Parquet file at a time, only the row groups they span are
+# decoded
+PARQUET_SLICE_ROWS = 65_536
+
+# A row and the position to resume from once it is loaded
+Row = tuple[int, str, int]
+
+
+def _museum_row(record: Any, where: str) -> tuple[str, int]:
+    try:
+        city = record["city"].strip()
+        population = int(record["population"])
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid museum at {where}: {e!r}") from e
+    if not city or population < 0:
+        raise ValueError(f"Invalid museum at {where}: {record!r}")
+    return city, population
+
+
+def read_jsonl(path: Path, position: int) -> Iterator[Row]:
+    """One JSON object per line, resumable at a byte offset."""
+    with path.open("rb") as f:
+        f.seek(position)
+        for line in f:
+            where = f"byte {position}"
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Invalid museum at {where}: {e}") from e
+            yield position, *_museum_row(record, where)
+
+
+def read_csv(path: Path, position: int) -> Iterator[Row]:
+    """CSV with a header line, resumable at a byte offset."""
+    with path.open("rb") as f:
+        header = next(csv.reader([f.readline().decode()]), [])
+        position = max(position, f.tell())
+        f.seek(position)
+
+        def lines() -> Iterator[str]:
+            nonlocal position
+            for line in f:
+                position += len(line)
+                yield line.decode()
+
+        # The reader pulls lines one record at a time, the position is the end
+        # of the record it just returned, quoted newlines included
+        record_start = position
+        for values in csv.reader(lines()):
+            if values:
+                yield (
+                    position,
+                    *_museum_row(dict(zip(header, values)), f"byte {record_start}"),
+                )
+            record_start = position
+
+
+def read_parquet(path: Path, position: int) -> Iterator[Row]:
+    """Parquet, resumable at a row index."""
+    frame = pl.scan_parquet(path).select("city", "population")
+    while True:
+        rows = frame.slice(position, PARQUET_SLICE_ROWS).collect()
+        if rows.is_empty():
+            return
+        for record in rows.iter_rows(named=True):
+            position += 1
+            yield position, *_museum_row(record, f"row {position - 1}")
+
+
+READERS: dict[str, Callable[[Path, int], Iterator[Row]]] = {
+    "jsonl": read_jsonl,
+    "csv": read_csv,
+    "parquet": read_parquet,
+}
+
+_SUFFIXES = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".parquet": "parquet",
+}
+
+
+def detect_format(path: Path) -> str:
+    try:
+        return _SUFFIXES[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown format for {path.name}, pass one of {', '.join(READERS)}"
+        ) from None
+
+
+@dataclass
+class ImportReport:
+    rows: int
+    """Rows loaded by this run."""
+    total_rows: int
+    """Rows loaded from the file so far, previous runs included."""
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+async def import_museums(
+    engine: AsyncEngine,
+    path: Path,
+    user_id: UUID,
+    file_format: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    restart: bool = False,
+) -> ImportReport:
+    """Load the museums of `path`, owned by `user_id`, resuming a previous run.
+
+    A file that was fully loaded loads nothing again unless `restart` is set.
+    """
+    path = path.resolve()
+    source = str(path)
+    size = path.stat().st_size
+    read = READERS[file_format or detect_format(path)]
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        async with session.begin():
+            if restart:
+                await bulk_load.delete_checkpoint(session, source)
+            checkpoint = await bulk_load.get_checkpoint(session, source)
+
+        position, total = 0, 0
+        if checkpoint is not None:
+            if checkpoint.source_size != size:
+                raise ValueError(
+                    f"{path.name} changed since its last load, pass --restart to "
+                    "load it from the start"
+                )
+            position, total = checkpoint.position, checkpoint.rows_loaded
+            logger.info(f"Resuming {path.name} after {total} rows")
+
+        rows = 0
+        start = time.perf_counter()
+        for batch in batched(read(path, position), batch_size):
+            async with session.begin():
+                await bulk_load.stage_museums(
+                    session, ((city, population) for _, city, population in batch)
+                )
+                await bulk_load.merge_staged_museums(session, user_id)
+                rows += len(batch)
+                await bulk_load.save_checkpoint(
+                    session, source, size, batch[-1][0], total + rows
+                )
+            seconds = time.perf_counter() - start
+            logger.info(f"{total + rows} rows loaded, {rows / seconds:.0f} rows/s")
+
+    return ImportReport(
+        rows=rows, total_rows=total + rows, seconds=time.perf_counter() - start
+    )
@@ -0,0 +1,115 @@
+"""Read replicas of the museum database, and routing of reads to them."""
+
+import asyncio
+import logging
+import math
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Generator
+
+from sqlalchemy import Select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from clients.db_health import DBHealth, DBState
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. 0 when it replayed everything it
+# received (an idle primary writes nothing to catch up on) and on a primary.
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+# Session info key of the replica engine a session reads from
+READ_ENGINE = "read_engine"
+
+
+@dataclass(eq=False)
+class Replica:
+    engine: AsyncEngine
+    health: DBHealth
+    # Seconds behind the primary at the last measure, infinite if unknown
+    lag: float = math.inf
+
+
+@dataclass(eq=False)
+class ReplicaSet:
+    """Replicas taking turns to serve reads.
+
+    A replica is skipped while it is down or more than `max_lag` seconds
+    behind, the primary serves the reads when none is left.
+    """
+
+    primary: AsyncEngine
+    replicas: list[Replica]
+    max_lag: float
+    _turn: int = field(default=0, init=False)
+
+    def read_engine(self) -> AsyncEngine:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._turn % len(self.replicas)]
+            self._turn += 1
+            if replica.health.state is not DBState.DOWN and replica.lag <= self.max_lag:
+                return replica.engine
+        return self.primary
+
+    async def measure_lag(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                replica.lag = float(await conn.scalar(LAG_QUERY))
+        except Exception as e:
+            logger.warning(f"Could not measure the lag of a replica: {e}")
+            replica.lag = math.inf
+
+    async def run(self, interval: float) -> None:
+        """Measure the lag of every replica every `interval` seconds, until
+        cancelled."""
+        while True:
+            await asyncio.gather(*(self.measure_lag(r) for r in self.replicas))
+            await asyncio.sleep(interval)
+
+    async def close(self) -> None:
+        for replica in self.replicas:
+            await replica.health.close()
+            await replica.engine.dispose()
+
+
+class RoutingSession(Session):
+    """Sends the SELECTs of a session to its read engine, if it has one.
+
+    Everything else (writes, flushes, raw SQL) stays on the primary.
+    `get_bind()` without a statement still returns the primary, so caches
+    keyed by the database URL don't split per replica.
+    """
+
+    def get_bind(
+        self, mapper: Any = None, clause: Any = None, **kw: Any
+    ) -> Engine | Connection:
+        read_engine = self.info.get(READ_ENGINE)
+        is_read = isinstance(clause, Select) and not self._flushing
+        if read_engine is not None and is_read:
+            return read_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@contextmanager
+def primary_reads(session: AsyncSession) -> Generator[None]:
+    """Send the reads of `session` to the primary inside the block.
+
+    For results that outlive the request, like cache entries and the versions
+    behind ETags: read from a lagging replica, they would be stored as current
+    after a write that they don't include.
+    """
+    read_engine = session.info.pop(READ_ENGINE, None)
+    try:
+        yield
+    finally:
+        if read_engine is not None:
+            session.info[READ_ENGINE] = read_engine
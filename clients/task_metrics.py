@@ -0,0 +1,75 @@
+"""Metrics of the task queue, for both the API and the worker."""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+import psqlpy
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult
+from taskiq_pg.psqlpy import PSQLPyBroker
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Label carrying the time a task was sent, to measure its wait in the queue
+ENQUEUED_AT_LABEL = "enqueued_at"
+QUEUE_DEPTH_QUERY = "SELECT task_name, status, count(*) FROM {} GROUP BY 1, 2"
+
+
+class TaskMetricsMiddleware(TaskiqMiddleware):
+    """Count sent tasks, and time their wait in the queue and their run."""
+
+    def pre_send(self, message: TaskiqMessage) -> TaskiqMessage:
+        message.labels[ENQUEUED_AT_LABEL] = str(time.time())
+        metrics.tasks_enqueued.inc(message.task_name)
+        return message
+
+    def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        enqueued_at = message.labels.get(ENQUEUED_AT_LABEL)
+        if enqueued_at is not None:
+            # Wall clock time across processes, clamped against clock skew
+            wait = max(0.0, time.time() - float(enqueued_at))
+            metrics.task_queue_wait.observe(wait, message.task_name)
+        return message
+
+    def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        status = "error" if result.is_err else "ok"
+        metrics.task_duration.observe(result.execution_time, message.task_name, status)
+
+
+async def sample_queue_depth(broker: PSQLPyBroker, interval: float) -> None:
+    """Refresh the queue depth gauge every `interval` seconds, until cancelled.
+
+    Scrapes then read the last sample instead of querying the broker database.
+    The connection is opened again after a failed sample, so the sampler
+    outlives a restart of the broker database.
+    """
+    connection: psqlpy.Connection | None = None
+    try:
+        while True:
+            try:
+                if connection is None:
+                    connection = await psqlpy.connect(dsn=broker.dsn)
+                result = await connection.fetch(
+                    QUEUE_DEPTH_QUERY.format(broker.table_name)
+                )
+                depths = {
+                    (row["task_name"], row["status"]): row["count"]
+                    for row in result.result()
+                }
+            except psqlpy.Error as e:
+                logger.warning(f"Could not sample the task queue depth: {e}")
+                if connection is not None:
+                    connection.close()
+                    connection = None
+            else:
+                # Tasks and statuses with no message left disappear from the sample
+                metrics.task_queue_depth.clear()
+                for (task_name, status), count in depths.items():
+                    metrics.task_queue_depth.set(count, task_name, status)
+            await asyncio.sleep(interval)
+    finally:
+        if connection is not None:
+            connection.close()
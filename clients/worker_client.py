@@ -1,7 +1,22 @@
 from dataclasses import dataclass
 
+import psqlpy
+from taskiq.kicker import AsyncKicker
 from taskiq_pg.psqlpy import PSQLPyBroker
-from worker import log_museum_created
+
+from server_timing import phase
+
+# Tasks of `worker.py`. Sent by name, so the API doesn't import the worker
+# module with its engine and model.
+LOG_MUSEUM_CREATED = "log_museum_created"
+LOG_MUSEUMS_CREATED = "log_museums_created"
+
+# Max museums per batch task, keeps the broker messages reasonably small
+MUSEUMS_PER_TASK = 500
+
+# Seconds a ping waits for the broker's database
+PING_TIMEOUT = 2
+
 
 @dataclass
 class WorkerClient:
@@ -13,13 +28,41 @@ class WorkerClient:
     async def shutdown(self) -> None:
         await self.broker.shutdown()
 
-    async def create_museum_task(self, *, museum_id: str, city: str) -> None:
-        task = await log_museum_created.kiq(museum_id, city)
-        print(await task.wait_result())
+    def _kicker(self, task_name: str) -> AsyncKicker:
+        return AsyncKicker(task_name=task_name, broker=self.broker, labels={})
+
+    async def create_museum_task(self, *, museum_id: str, city: str) -> str:
+        """Enqueue the follow-up work of a new museum, return the task id.
+
+        Does not wait for the result, the prediction is read back later from
+        the museum's prediction endpoint.
+        """
+        with phase("enqueue"):
+            task = await self._kicker(LOG_MUSEUM_CREATED).kiq(museum_id, city)
+        return task.task_id
+
+    async def create_museums_task(self, museums: list[tuple[str, str]]) -> None:
+        """Enqueue the follow-up work for many (museum_id, city) pairs at once.
 
-    async def get_num_tasks(self) -> int:
-        """Return num tasks."""
-        all_tasks = self.broker.get_all_tasks()
-        return len(all_tasks)
+        Does not wait for the results, bulk imports would otherwise block on
+        the inference of every museum.
+        """
+        with phase("enqueue"):
+            for start in range(0, len(museums), MUSEUMS_PER_TASK):
+                await self._kicker(LOG_MUSEUMS_CREATED).kiq(
+                    museums[start : start + MUSEUMS_PER_TASK]
+                )
 
+    async def ping(self) -> None:
+        """Run a query on the broker's database, raise if it is unreachable.
 
+        Uses a connection of its own, the broker's pool is internal to
+        taskiq-pg.
+        """
+        conn = await psqlpy.connect(
+            dsn=self.broker.dsn, connect_timeout_sec=PING_TIMEOUT
+        )
+        try:
+            await conn.execute("SELECT 1")
+        finally:
+            conn.close()
@@ -0,0 +1,54 @@
+"""HTTP conditional GET (ETag / Last-Modified) for collection endpoints."""
+
+from datetime import UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+
+from litestar import Request, Response
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
+
+from orm.collection import CollectionVersion
+
+
+def validator_headers(version: CollectionVersion, variant: str = "") -> dict[str, str]:
+    """ETag and Last-Modified headers for a collection.
+
+    `variant` must hold everything else the body depends on, e.g. the page
+    parameters, so two pages of the same collection don't share an ETag.
+    """
+    digest = blake2b(
+        f"{version.last_modified}|{version.count}|{variant}".encode(), digest_size=12
+    ).hexdigest()
+    headers = {"etag": f'"{digest}"'}
+    if version.last_modified is not None:
+        headers["last-modified"] = format_datetime(version.last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    request: Request, version: CollectionVersion, headers: dict[str, str]
+) -> bool:
+    """Whether the client's cached copy is still valid.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or headers["etag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or version.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have a one second resolution
+    return version.last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    return Response(None, status_code=HTTP_304_NOT_MODIFIED, headers=headers)
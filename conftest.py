@@ -5,7 +5,7 @@ from litestar.testing import AsyncTestClient
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy import text
 
-from app import app, settings
+from app import app, db_config, settings
 from clients.db_client import DBClient
 from orm.models.user import User
 from sqlalchemy import select
@@ -129,40 +129,20 @@ async def db_session(db_client: DBClient):
         yield session
 
 
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession
-
 @pytest.fixture
 async def test_client(db_client: DBClient): # Depend on db_client to ensure DB is set up
     """
     Provides a Litestar AsyncTestClient for functional tests.
     Updates the app's state with the isolated db_client.
     """
-    # We need to override the db_client in the app state for the test
-    app.state.db_client = db_client
-    
-    async def get_test_db_session() -> AsyncGenerator[AsyncSession, None]:
-        async with async_sessionmaker(db_client.engine, expire_on_commit=False)() as session:
-            yield session
-
-    # Override the 'db_session' dependency which is what controllers/dependencies use
-    # We save the original if strictly necessary, but for tests usually fine to just overwrite/restore
-    
-    # Note: Litestar v2 uses app.dependencies. We assume the key is 'db_session' matching the parameter name.
-    # If the plugin uses a different mechanism, this might be tricky, but let's try 'db_session'.
-    from litestar.di import Provide
-    
-    original_dep = app.dependencies.get("db_session")
-    app.dependencies["db_session"] = Provide(get_test_db_session)
-    
     async with AsyncTestClient(app=app) as client:
+        # Point the app at the test database. Set after startup, which installs
+        # the app's own db_client and the plugin's own session maker.
+        app.state.db_client = db_client
+        app.state[db_config.session_maker_app_state_key] = async_sessionmaker(
+            db_client.engine, expire_on_commit=False
+        )
         yield client
-    
-    # Restore
-    if original_dep:
-        app.dependencies["db_session"] = original_dep
-    else:
-        del app.dependencies["db_session"]
 
 
 @pytest.fixture
@@ -0,0 +1,17 @@
+from litestar import Controller, get
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api_models.city import CityStatsRead
+from orm import city_stats as city_stats_repo
+from server_timing import phase
+
+
+class CityController(Controller):
+    path = "/cities"
+
+    @get("/stats")
+    async def list_city_stats(self, db_session: AsyncSession) -> list[CityStatsRead]:
+        """Museum and prediction aggregates per city, read from the rollup."""
+        rows = await city_stats_repo.list_city_stats(db_session)
+        with phase("validate"):
+            return [CityStatsRead.model_validate(row) for row in rows]
@@ -1,11 +1,11 @@
 """Health checkpoints."""
 from litestar import Controller, get
-from litestar.status_codes import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+from litestar.enums import MediaType
+from litestar.status_codes import HTTP_200_OK
 from litestar.response import Response
 from litestar.datastructures import State
 
-from clients.db_client import DBClient
-from clients.worker_client import WorkerClient
+from readiness import Readiness
 
 
 class HealthController(Controller):
@@ -17,22 +17,14 @@ class HealthController(Controller):
         return Response({"status": "ok"}, status_code=HTTP_200_OK)
 
     @get("/ready", status_code=HTTP_200_OK)
-    async def ready(self, state: State) -> Response[dict[str, str]]:
-        """Check if the server is ready to accept requests."""
-        db_client: DBClient = state.db_client
-        is_db_migrated = await db_client.check_migrations()
-        if not is_db_migrated:
-            return Response(
-                {"status": "not ready", "detail": "db not migrated"},
-                status_code=HTTP_503_SERVICE_UNAVAILABLE,
-            )
+    async def ready(self, state: State) -> Response[bytes]:
+        """Check if the server is ready to accept requests.
 
-        worker_client: WorkerClient = state.worker_client
-        is_worker_ready = await worker_client.get_num_tasks()
-        if not is_worker_ready:
-            return Response(
-                {"status": "not ready", "detail": "worker not ready"},
-                status_code=HTTP_503_SERVICE_UNAVAILABLE,
-            )
-
-        return Response({"status": "ready"}, status_code=HTTP_200_OK)
+        Serves the result of the last background check, see `Readiness`.
+        """
+        readiness: Readiness = state.readiness
+        return Response(
+            readiness.status.body,
+            status_code=readiness.status.status_code,
+            media_type=MediaType.JSON,
+        )
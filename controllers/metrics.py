@@ -0,0 +1,15 @@
+"""Prometheus scrape endpoint."""
+
+from litestar import Controller, get
+from litestar.response import Response
+
+import metrics
+
+
+class MetricsController(Controller):
+    path = "/metrics"
+
+    @get("/", include_in_schema=False)
+    async def scrape(self) -> Response[str]:
+        """Current value of every metric, read from memory."""
+        return Response(metrics.REGISTRY.render(), media_type=metrics.MEDIA_TYPE)
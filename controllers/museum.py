@@ -1,13 +1,49 @@
-from litestar import Controller, get, post
-from litestar.status_codes import HTTP_201_CREATED
+import asyncio
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Annotated
+from uuid import UUID
+
+from litestar import Controller, MediaType, Request, get, post
+from litestar.datastructures import State
+from litestar.exceptions import NotFoundException, ValidationException
+from litestar.openapi import ResponseSpec
+from litestar.params import Parameter
+from litestar.response import Response, Stream
+from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_202_ACCEPTED
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from orm import museum as museum_repo
-from api_models.museum import MuseumCreate, MuseumRead
+from orm import visitor_prediction as prediction_repo
+from api_models.base import json_encoder
+from api_models.museum import (
+    MuseumCreate,
+    MuseumCreated,
+    MuseumPage,
+    MuseumRead,
+    MuseumRow,
+    MuseumRowPage,
+    PredictionRead,
+    PredictionStatus,
+)
+from api_models.user import ApiUserOut
+from caching.query_cache import QueryCache
+from clients.replicas import READ_ENGINE, primary_reads
 from clients.worker_client import WorkerClient
+from conditional_get import is_not_modified, not_modified, validator_headers
+from controllers.streaming import NDJSON_MEDIA_TYPE, ndjson_stream
+from orm.collection import CollectionVersion, get_collection_version
+from orm.models.museum import Museum
+from orm.museum import MuseumFilter, MuseumSort, SortOrder
+from server_timing import phase
 
-
-from orm.models.user import User
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 10_000
+MAX_PREDICTION_WAIT_MS = 30_000
+# Seconds between two reads of a pending prediction
+PREDICTION_POLL_INTERVAL = 0.1
 
 
 class MuseumController(Controller):
@@ -19,17 +55,243 @@ class MuseumController(Controller):
         data: MuseumCreate,
         db_session: AsyncSession,
         worker_client: WorkerClient,
-        user: User,
-    ) -> MuseumRead:
-        museum = await museum_repo.create_museum(db_session, data, user.id)
+        museum_cache: QueryCache,
+        user: ApiUserOut,
+    ) -> MuseumCreated:
+        """Create a museum and enqueue the prediction of its visitors.
+
+        Returns without waiting for the worker, the prediction is read from
+        `GET /museums/{museum_id}/prediction` once done.
+        """
+        museum = await museum_repo.create_museum(
+            db_session, data, user.id, museum_cache
+        )
+        with phase("validate"):
+            created = MuseumRead.model_validate(museum)
+
+        # Commit before enqueueing so the worker can see the new row
+        await db_session.commit()
+        task_id = await worker_client.create_museum_task(
+            museum_id=str(created.id), city=created.city
+        )
+
+        return MuseumCreated(**created.model_dump(), prediction_task_id=task_id)
+
+    @post("/bulk", status_code=HTTP_201_CREATED)
+    async def create_museums(
+        self,
+        data: list[MuseumCreate],
+        db_session: AsyncSession,
+        worker_client: WorkerClient,
+        museum_cache: QueryCache,
+        user: ApiUserOut,
+    ) -> list[MuseumRead]:
+        """Create many museums in a handful of set-based statements."""
+        if len(data) > MAX_BULK_SIZE:
+            raise ValidationException(
+                f"At most {MAX_BULK_SIZE} museums can be created per request"
+            )
+
+        museums = await museum_repo.create_museums(
+            db_session, data, user.id, museum_cache
+        )
+        with phase("validate"):
+            created = [MuseumRead.model_validate(m) for m in museums]
+
+        # Commit before enqueueing so the worker can see the new rows
+        await db_session.commit()
+        await worker_client.create_museums_task([(str(m.id), m.city) for m in created])
+
+        return created
+
+    @get(
+        "/",
+        responses={
+            HTTP_200_OK: ResponseSpec(
+                MuseumPage, generate_examples=False, description="A page of museums"
+            )
+        },
+    )
+    async def list_museums(
+        self,
+        request: Request,
+        db_session: AsyncSession,
+        museum_cache: QueryCache,
+        limit: Annotated[
+            int, Parameter(ge=1, le=MAX_PAGE_SIZE, description="Page size")
+        ] = DEFAULT_PAGE_SIZE,
+        after: Annotated[
+            UUID | None,
+            Parameter(description="Return museums after this cursor (a museum id)"),
+        ] = None,
+        city: Annotated[
+            str | None, Parameter(description="Only museums in this city")
+        ] = None,
+        min_population: Annotated[
+            int | None, Parameter(ge=0, description="Minimum number of visitors")
+        ] = None,
+        max_population: Annotated[
+            int | None, Parameter(ge=0, description="Maximum number of visitors")
+        ] = None,
+        user_id: Annotated[
+            UUID | None, Parameter(description="Only museums created by this user")
+        ] = None,
+        created_after: Annotated[
+            datetime | None,
+            Parameter(description="Only museums created after this time"),
+        ] = None,
+        sort: Annotated[MuseumSort, Parameter(description="Sort key")] = MuseumSort.ID,
+        order: Annotated[
+            SortOrder, Parameter(description="Sort direction")
+        ] = SortOrder.ASC,
+    ) -> Response[bytes]:
+        """List museums a page at a time, filtered and sorted in the database.
+
+        Pages are keyed on the museum id, pass the returned cursor with the same
+        filters and sort to get the next one. Answers 304 when the client's
+        ETag / Last-Modified is still current.
+        """
+        filters = MuseumFilter(
+            city=city,
+            min_population=min_population,
+            max_population=max_population,
+            user_id=user_id,
+            created_after=created_after,
+        )
+        # Everything the page depends on besides the collection version
+        variant = f"{limit}:{after}:{sort}:{order}:{filters}"
+
+        # Cached for every reader, so loaded from the primary
+        async def load_version() -> bytes:
+            with primary_reads(db_session):
+                version = await get_collection_version(db_session, Museum)
+            return version.to_bytes()
+
+        # The version is cached too, a poll of unchanged data costs no query
+        version = CollectionVersion.from_bytes(
+            await museum_cache.get_or_set("version", load_version)
+        )
+        headers = validator_headers(version, variant=variant)
+        if is_not_modified(request, version, headers):
+            return not_modified(headers)
+
+        async def load_page() -> bytes:
+            # The replica serves the page once it has replayed the writes behind
+            # the version, a lagging one would store an old page under it
+            lagging = (
+                READ_ENGINE in db_session.info
+                and await get_collection_version(db_session, Museum) != version
+            )
+            # Fetch one extra row to know whether there is a next page
+            with primary_reads(db_session) if lagging else nullcontext():
+                rows = await museum_repo.list_museum_rows(
+                    db_session,
+                    limit=limit + 1,
+                    after=after,
+                    filters=filters,
+                    sort=sort,
+                    order=order,
+                )
+            # Plain rows straight to JSON, no ORM objects or pydantic validation
+            with phase("serialize"):
+                items = [MuseumRow(*row) for row in rows[:limit]]
+                next_cursor = items[-1].id if len(rows) > limit else None
+                page = MuseumRowPage(
+                    items=items, results_per_page=limit, cursor=next_cursor
+                )
+                return json_encoder.encode(page)
+
+        content = await museum_cache.get_or_set(f"list:{variant}", load_page)
+        return Response(content, media_type=MediaType.JSON, headers=headers)
+
+    @get(
+        "/{museum_id:uuid}",
+        responses={
+            HTTP_200_OK: ResponseSpec(
+                MuseumRead, generate_examples=False, description="The museum"
+            )
+        },
+    )
+    async def get_museum(
+        self, museum_id: UUID, db_session: AsyncSession, museum_cache: QueryCache
+    ) -> Response[bytes]:
+        async def load_museum() -> bytes | None:
+            museum = await museum_repo.get_museum(db_session, museum_id)
+            if not museum and READ_ENGINE in db_session.info:
+                # Possibly created after the replica's last replay
+                with primary_reads(db_session):
+                    museum = await museum_repo.get_museum(db_session, museum_id)
+            if not museum:
+                return None
+            with phase("validate"):
+                read = MuseumRead.model_validate(museum)
+            with phase("serialize"):
+                return read.model_dump_json().encode()
+
+        content = await museum_cache.get_or_set(f"museum:{museum_id}", load_museum)
+        if content is None:
+            raise NotFoundException(f"Museum {museum_id} not found")
+        return Response(content, media_type=MediaType.JSON)
+
+    @get("/{museum_id:uuid}/prediction")
+    async def get_museum_prediction(
+        self,
+        museum_id: UUID,
+        db_session: AsyncSession,
+        wait: Annotated[
+            int,
+            Parameter(
+                ge=0,
+                le=MAX_PREDICTION_WAIT_MS,
+                description="Milliseconds to wait for a pending prediction",
+            ),
+        ] = 0,
+    ) -> Response[PredictionRead]:
+        """The latest visitor prediction of a museum.
+
+        Answers 202 while the worker hasn't stored it yet. With `wait`, the
+        request is held until the prediction is stored or the wait is over.
+        """
+        # Polled right after the create and the worker's write, which a
+        # lagging replica may not have replayed yet
+        with primary_reads(db_session):
+            if not await museum_repo.get_museum(db_session, museum_id):
+                raise NotFoundException(f"Museum {museum_id} not found")
 
-        # Send task to worker
-        # museum.city is a City object, we need to pass the name string
-        await worker_client.log_museum_created(str(museum.id), museum.city.name)
+            deadline = time.monotonic() + wait / 1000
+            with phase("prediction-wait"):
+                while True:
+                    prediction = await prediction_repo.get_latest_prediction(
+                        db_session, museum_id
+                    )
+                    remaining = deadline - time.monotonic()
+                    if prediction or remaining <= 0:
+                        break
+                    # Hand the connection back to the pool between two reads
+                    await db_session.rollback()
+                    await asyncio.sleep(min(PREDICTION_POLL_INTERVAL, remaining))
 
-        return MuseumRead.model_validate(museum)
+        if prediction is None:
+            return Response(
+                PredictionRead(museum_id=museum_id, status=PredictionStatus.PENDING),
+                status_code=HTTP_202_ACCEPTED,
+            )
+        return Response(
+            PredictionRead(
+                museum_id=museum_id,
+                status=PredictionStatus.DONE,
+                predicted_visitors=prediction.predicted_visitors,
+                predicted_at=prediction.created_at,
+            ),
+            status_code=HTTP_200_OK,
+        )
 
-    @get("/")
-    async def list_museums(self, db_session: AsyncSession) -> list[MuseumRead]:
-        museums = await museum_repo.list_museums(db_session)
-        return [MuseumRead.model_validate(m) for m in museums]
+    @get("/stream", media_type=NDJSON_MEDIA_TYPE)
+    async def stream_museums(self, state: State) -> Stream:
+        """Stream every museum as newline-delimited JSON."""
+        return Stream(
+            ndjson_stream(
+                state.db_client.read_engine(), museum_repo.stream_museums, MuseumRead
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
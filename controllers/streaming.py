@@ -0,0 +1,27 @@
+"""Helpers for streaming large collections as newline-delimited JSON."""
+
+from typing import AsyncIterator, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from api_models.base import APIBase
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def ndjson_stream(
+    engine: AsyncEngine,
+    stream_rows: Callable[[AsyncSession], AsyncIterator[Sequence[object]]],
+    model: type[APIBase],
+) -> AsyncIterator[bytes]:
+    """Encode rows from `stream_rows` as NDJSON, one chunk per batch of rows.
+
+    The stream owns its session: the request session is closed as soon as the
+    response starts, while this one must stay open until the last row is sent.
+    """
+    async with AsyncSession(engine) as session:
+        async for rows in stream_rows(session):
+            yield b"".join(
+                model.model_validate(row).model_dump_json().encode() + b"\n"
+                for row in rows
+            )
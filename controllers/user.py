@@ -1,13 +1,22 @@
 from uuid import UUID
 
-from litestar import Controller, get, post, patch
-from litestar.status_codes import HTTP_201_CREATED
+from litestar import Controller, MediaType, Request, Response, get, post, patch
+from litestar.datastructures import State
+from litestar.openapi import ResponseSpec
+from litestar.response import Stream
+from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED
 from litestar.exceptions import NotFoundException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from orm import user as user_repo
-from api_models.user import ApiUserIn, ApiUserOut
+from api_models.base import json_encoder
+from api_models.user import ApiUserIn, ApiUserOut, UserRow
+from conditional_get import is_not_modified, not_modified, validator_headers
+from controllers.streaming import NDJSON_MEDIA_TYPE, ndjson_stream
+from orm.collection import get_collection_version
+from orm.models.user import User
 from guards import admin_guard
+from server_timing import phase
 
 
 class UserController(Controller):
@@ -21,10 +30,37 @@ class UserController(Controller):
         user = await user_repo.create_user(db_session, data)
         return ApiUserOut.model_validate(user)
 
-    @get("/")
-    async def list_users(self, db_session: AsyncSession) -> list[ApiUserOut]:
-        users = await user_repo.list_users(db_session)
-        return [ApiUserOut.model_validate(u) for u in users]
+    @get(
+        "/",
+        responses={
+            HTTP_200_OK: ResponseSpec(
+                list[ApiUserOut], generate_examples=False, description="The users"
+            )
+        },
+    )
+    async def list_users(
+        self, request: Request, db_session: AsyncSession
+    ) -> Response[bytes]:
+        """List users, or answer 304 if the client's copy is still current."""
+        version = await get_collection_version(db_session, User)
+        headers = validator_headers(version)
+        if is_not_modified(request, version, headers):
+            return not_modified(headers)
+
+        rows = await user_repo.list_user_rows(db_session)
+        with phase("serialize"):
+            content = json_encoder.encode([UserRow(*row) for row in rows])
+        return Response(content, media_type=MediaType.JSON, headers=headers)
+
+    @get("/stream", media_type=NDJSON_MEDIA_TYPE)
+    async def stream_users(self, state: State) -> Stream:
+        """Stream every user as newline-delimited JSON."""
+        return Stream(
+            ndjson_stream(
+                state.db_client.read_engine(), user_repo.stream_users, ApiUserOut
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
 
     @get("/{user_id:uuid}")
     async def get_user(self, user_id: UUID, db_session: AsyncSession) -> ApiUserOut:
@@ -36,7 +72,7 @@ class UserController(Controller):
     @get("whoami")
     async def whoami(self, scope: dict) -> ApiUserOut:
         """Return the current user."""
-        return ApiUserOut.model_validate(scope.user)
+        return ApiUserOut.model_validate(scope["user"])
 
     @patch("/{user_id:uuid}")
     async def update_user(
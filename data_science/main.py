@@ -1,4 +1,5 @@
 import asyncio
+import time
 from pathlib import Path
 import polars as pl
 
@@ -9,9 +10,13 @@ from data_science.data_fetcher import get_museum_visitors
 from data_science.constants import MUSEUMS_URL
 from data_science.onnx_train_predict import train_model
 from settings import settings
-from orm.city import get_or_create_city
-from orm.museum import create_museum
-from api_models.museum import MuseumCreate
+from orm.bulk_load import delete_museums_of_user, load_museums
+from orm.user import get_or_create_user_id
+
+
+# Owner of the museums loaded by the pipeline. A refresh replaces all of them.
+PIPELINE_USER_NAME = "Data Pipeline"
+PIPELINE_USER_EMAIL = "pipeline@museum.com"
 
 
 def build_ml_model(data: list, model_path: Path):
@@ -28,19 +33,23 @@ def build_ml_model(data: list, model_path: Path):
     train_model(df, sklearn_path, model_path)
 
 
-async def save_in_db(session, cities):
-    """Save cities and museums in db."""
-    async with session.begin():
-        for city_data in cities:
-            # Ensure city exists
-            await get_or_create_city(session, city_data.name, city_data.population)
+async def save_in_db(session, cities) -> int:
+    """Replace the museums of the pipeline user with the fetched ones.
 
-            # Create Museums
-            for _ in city_data.museums:
-                museum_data = MuseumCreate(
-                    city=city_data.name, population=city_data.population
-                )
-                await create_museum(session, museum_data)
+    One transaction: the previous load is deleted, the new museums are copied
+    in and merged with set-based upserts, so readers see either the old or the
+    new data. Returns the number of museums loaded.
+    """
+    async with session.begin():
+        user_id = await get_or_create_user_id(
+            session, PIPELINE_USER_NAME, PIPELINE_USER_EMAIL
+        )
+        await delete_museums_of_user(session, user_id)
+        return await load_museums(
+            session,
+            ((city.name, city.population) for city in cities for _ in city.museums),
+            user_id,
+        )
 
 
 async def main():
@@ -51,7 +60,9 @@ async def main():
 
     session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
     async with session_maker() as session:
-        await save_in_db(session, cities)
+        start = time.perf_counter()
+        count = await save_in_db(session, cities)
+        print(f"Loaded {count} museums in {time.perf_counter() - start:.2f}s")
 
     model_path = Path("cache/model.onnx")
     model_path.parent.mkdir(exist_ok=True)
@@ -1,6 +1,7 @@
 from litestar import Request, Response
 from litestar.status_codes import HTTP_500_INTERNAL_SERVER_ERROR, HTTP_404_NOT_FOUND
-from litestar.exceptions import NotFoundException
+from litestar.exceptions import HTTPException, NotFoundException
+from litestar.exceptions.responses import create_exception_response
 from loguru import logger
 
 
@@ -25,3 +26,11 @@ def not_found_error_handler(request: Request, exc: NotFoundException) -> Respons
         content={"status_code": 404, "detail": exc.detail},
         status_code=HTTP_404_NOT_FOUND,
     )
+
+
+def http_exception_handler(request: Request, exc: HTTPException) -> Response:
+    """
+    Answer other HTTP errors (401, 403, 400...) with their own status code,
+    which the catch-all 500 handler would otherwise swallow.
+    """
+    return create_exception_response(request, exc)
@@ -1,22 +1,34 @@
-from litestar.connection import Request
+from advanced_alchemy.extensions.litestar import SQLAlchemyAsyncConfig, SQLAlchemyPlugin
+from litestar.connection import ASGIConnection
 from litestar.exceptions import NotAuthorizedException
 from litestar.handlers import BaseRouteHandler
 from sqlalchemy.ext.asyncio import AsyncSession
-from orm.models.user import User
+from orm.user import get_cached_user
 
 
-async def admin_guard(connection: Request, _: BaseRouteHandler) -> None:
+def request_session(connection: ASGIConnection) -> AsyncSession:
+    """The session of the current request, the one handlers get as `db_session`.
+
+    The plugin keeps it in the request scope and commits and closes it once the
+    response starts, so guards share the handler's unit of work and identity
+    map instead of checking out a connection of their own.
+    """
+    [config] = connection.app.plugins.get(SQLAlchemyPlugin).config
+    if not isinstance(config, SQLAlchemyAsyncConfig):
+        raise TypeError("The app's SQLAlchemy config is not async")
+    return config.provide_session(connection.app.state, connection.scope)
+
+
+async def admin_guard(connection: ASGIConnection, _: BaseRouteHandler) -> None:
     user_id = connection.scope.get("user_id")
     
     if not user_id:
          # Should have been caught by middleware, but safe to check
          raise NotAuthorizedException("User ID not found")
 
-    db_client = connection.app.state.db_client
-    async with AsyncSession(db_client.engine) as session:
-        user = await session.get(User, user_id)
-        if not user or not user.is_admin:
-            raise NotAuthorizedException("User is not an admin")
-        
-        # Put user object in scope for handlers like whoami
-        connection.scope["user"] = user
+    user = await get_cached_user(request_session(connection), user_id)
+    if not user or not user.is_admin:
+        raise NotAuthorizedException("User is not an admin")
+
+    # Put user object in scope for handlers like whoami
+    connection.scope["user"] = user
@@ -0,0 +1,156 @@
+"""Micro-batched ONNX inference.
+
+Concurrent tasks each ask for one prediction. Running the model once per task
+pays the fixed cost of `session.run` every time. The predictor instead
+collects the requests of up to `max_wait` seconds, or `max_batch_size`
+requests, into one (n, 1) input and fans the outputs back out.
+
+With `max_wait=0` a batch holds the requests made in the same event loop
+iteration, e.g. by the tasks whose queries returned together. A lone request
+then only waits for the next iteration.
+
+`session.run` is a blocking native call. Given an executor, batches run there
+and the event loop keeps serving the other tasks' I/O in the meantime.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Protocol, Sequence
+
+import numpy as np
+from onnxruntime import (
+    ExecutionMode,
+    GraphOptimizationLevel,
+    InferenceSession,
+    SessionOptions,
+)
+
+import metrics
+
+_GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+_EXECUTION_MODES = {
+    "sequential": ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ExecutionMode.ORT_PARALLEL,
+}
+
+
+def session_options(
+    intra_op_num_threads: int = 0,
+    inter_op_num_threads: int = 0,
+    graph_optimization_level: str = "all",
+    execution_mode: str = "sequential",
+) -> SessionOptions:
+    """ONNX Runtime options, thread counts of 0 keep the runtime's defaults."""
+    options = SessionOptions()
+    options.intra_op_num_threads = intra_op_num_threads
+    options.inter_op_num_threads = inter_op_num_threads
+    options.graph_optimization_level = _GRAPH_OPTIMIZATION_LEVELS[
+        graph_optimization_level
+    ]
+    options.execution_mode = _EXECUTION_MODES[execution_mode]
+    return options
+
+
+def load_session(model_path: Path, **options) -> InferenceSession:
+    """Load a model, `options` are those of `session_options`."""
+    return InferenceSession(str(model_path), sess_options=session_options(**options))
+
+
+class ModelSession(Protocol):
+    """What the predictor needs of an `InferenceSession`."""
+
+    def run(
+        self, output_names: list[str] | None, input_feed: dict[str, Any], /
+    ) -> Sequence[Any]: ...
+
+
+@dataclass(eq=False)
+class BatchPredictor:
+    session: ModelSession
+    max_batch_size: int = 64
+    max_wait: float = 0.0
+    # Where batches run, `None` runs them on the event loop
+    executor: Executor | None = None
+    # Populations waiting for the next batch and the futures of their callers
+    _populations: list[int] = field(default_factory=list, init=False)
+    _futures: list[asyncio.Future[float]] = field(default_factory=list, init=False)
+    _timer: asyncio.Handle | None = field(default=None, init=False)
+
+    async def predict(self, population: int) -> float:
+        """Predicted visitors for a city of `population`, from the next batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._populations.append(population)
+        self._futures.append(future)
+        if len(self._futures) >= self.max_batch_size:
+            self._run_batch()
+        elif self._timer is None:
+            if self.max_wait > 0:
+                self._timer = loop.call_later(self.max_wait, self._run_batch)
+            else:
+                self._timer = loop.call_soon(self._run_batch)
+        return await future
+
+    def _run_batch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        populations, self._populations = self._populations, []
+        futures, self._futures = self._futures, []
+
+        # Input name 'population' matches training script
+        x_input = np.array(populations, dtype=np.int64).reshape(-1, 1)
+        if self.executor is None:
+            try:
+                result = self._infer(x_input)
+            except Exception as e:
+                self._fail(futures, e)
+            else:
+                self._resolve(futures, *result)
+            return
+
+        run = asyncio.get_running_loop().run_in_executor(
+            self.executor, self._infer, x_input
+        )
+        run.add_done_callback(partial(self._on_run_done, futures))
+
+    def _infer(self, x_input: np.ndarray) -> tuple[np.ndarray, float]:
+        # May run on an executor thread, metrics are only updated on the loop
+        start = time.perf_counter()
+        [output] = self.session.run(None, {"population": x_input})
+        # The model's single output is a dense tensor, asarray doesn't copy it
+        return np.asarray(output), time.perf_counter() - start
+
+    def _on_run_done(
+        self, futures: list[asyncio.Future[float]], run: asyncio.Future
+    ) -> None:
+        try:
+            result = run.result()
+        except Exception as e:
+            self._fail(futures, e)
+        else:
+            self._resolve(futures, *result)
+
+    def _fail(self, futures: list[asyncio.Future[float]], error: Exception) -> None:
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _resolve(
+        self, futures: list[asyncio.Future[float]], output: np.ndarray, seconds: float
+    ) -> None:
+        metrics.inference_duration.observe(seconds)
+        metrics.inference_batch_size.observe(len(futures))
+        for future, value in zip(futures, output[:, 0].tolist()):
+            # A caller may have been cancelled while waiting for the batch
+            if not future.done():
+                future.set_result(value)
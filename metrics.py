@@ -0,0 +1,334 @@
+"""Process-local metrics in the Prometheus text exposition format.
+
+Updates are plain dict and float writes. Each process runs a single event
+loop and never yields in the middle of an update, so no lock is needed.
+Scrapes only read these values, they never query the database.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, ClassVar, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.pool import QueuePool
+
+import server_timing
+
+MEDIA_TYPE = "text/plain; version=0.0.4"
+CONTENT_TYPE = f"{MEDIA_TYPE}; charset=utf-8"
+
+# Seconds, from a fast SQL query to a slow bulk request
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+@dataclass(eq=False)
+class Metric(ABC):
+    name: str
+    documentation: str
+    labelnames: Labels = ()
+    kind: ClassVar[str] = "untyped"
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def _sample(
+        self, labels: Labels, value: float, suffix: str = "", extra: str = ""
+    ) -> str:
+        label_str = _format_labels(self.labelnames, labels, extra)
+        return f"{self.name}{suffix}{label_str} {_format_value(value)}"
+
+    @abstractmethod
+    def render(self) -> Iterable[str]: ...
+
+
+@dataclass(eq=False)
+class Counter(Metric):
+    kind = "counter"
+    _values: dict[Labels, float] = field(default_factory=dict, init=False)
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        for labels, value in self._values.items():
+            yield self._sample(labels, value)
+
+
+@dataclass(eq=False)
+class Gauge(Metric):
+    kind = "gauge"
+    _values: dict[Labels, float] = field(default_factory=dict, init=False)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        for labels, value in self._values.items():
+            yield self._sample(labels, value)
+
+
+@dataclass(eq=False)
+class CallbackGauge(Metric):
+    """A gauge read from live objects at scrape time, e.g. a connection pool."""
+
+    kind = "gauge"
+    _callbacks: dict[Labels, Callable[[], float]] = field(
+        default_factory=dict, init=False
+    )
+
+    def set_function(self, callback: Callable[[], float], *labels: str) -> None:
+        self._callbacks[labels] = callback
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        for labels, callback in self._callbacks.items():
+            yield self._sample(labels, callback())
+
+
+@dataclass(eq=False)
+class Histogram(Metric):
+    kind = "histogram"
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    # Per label values: count per bucket (the last one is +Inf), sum
+    _values: dict[Labels, tuple[list[int], list[float]]] = field(
+        default_factory=dict, init=False
+    )
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        # Only the bucket of the value, the cumulative counts are built on scrape
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> Iterable[str]:
+        yield from self._header()
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield self._sample(labels, cumulative, "_bucket", le)
+            yield self._sample(labels, total[0], "_sum")
+            yield self._sample(labels, cumulative, "_count")
+
+
+@dataclass(eq=False)
+class Registry:
+    metrics: list[Metric] = field(default_factory=list)
+
+    def register[M: Metric](self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = [line for metric in self.metrics for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# HTTP
+http_request_duration = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = REGISTRY.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests being served by route",
+        ("method", "route"),
+    )
+)
+
+# Database pool
+db_pool_size = REGISTRY.register(
+    CallbackGauge("db_pool_size", "Configured size of the connection pool", ("engine",))
+)
+db_pool_checked_out = REGISTRY.register(
+    CallbackGauge("db_pool_checked_out", "Connections in use", ("engine",))
+)
+db_pool_overflow = REGISTRY.register(
+    CallbackGauge(
+        "db_pool_overflow", "Connections open beyond the pool size", ("engine",)
+    )
+)
+db_replica_lag = REGISTRY.register(
+    CallbackGauge(
+        "db_replica_lag_seconds", "Replication lag at the last measure", ("engine",)
+    )
+)
+db_pool_checkout_duration = REGISTRY.register(
+    Histogram(
+        "db_pool_checkout_seconds",
+        "Time a session waited for a pooled connection",
+        ("engine",),
+    )
+)
+
+# Task queue
+task_queue_depth = REGISTRY.register(
+    Gauge(
+        "task_queue_depth",
+        "Messages in the task queue by status, sampled periodically",
+        ("task", "status"),
+    )
+)
+tasks_enqueued = REGISTRY.register(
+    Counter("tasks_enqueued_total", "Tasks sent to the queue", ("task",))
+)
+task_queue_wait = REGISTRY.register(
+    Histogram(
+        "task_queue_wait_seconds",
+        "Time between a task being sent and a worker starting it",
+        ("task",),
+    )
+)
+task_duration = REGISTRY.register(
+    Histogram("task_duration_seconds", "Task execution time", ("task", "status"))
+)
+
+# Inference
+inference_duration = REGISTRY.register(
+    Histogram("inference_duration_seconds", "ONNX model inference latency")
+)
+inference_batch_size = REGISTRY.register(
+    Histogram(
+        "inference_batch_size",
+        "Predictions per ONNX model run",
+        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+    )
+)
+
+
+async def _handle_scrape(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        # Any request gets the metrics, only the end of its headers matters
+        await reader.readuntil(b"\r\n\r\n")
+        body = REGISTRY.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            + f"Content-Type: {CONTENT_TYPE}\r\n".encode()
+            + f"Content-Length: {len(body)}\r\n".encode()
+            + b"Connection: close\r\n\r\n"
+            + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_http_server(host: str, port: int) -> asyncio.Server:
+    """Serve the metrics of a process without a web app, e.g. the worker."""
+    return await asyncio.start_server(_handle_scrape, host, port)
+
+
+# When the current task's session started asking for a connection
+_checkout_start: ContextVar[float | None] = ContextVar("checkout_start", default=None)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Export the pool gauges and checkout wait time of `engine` as `name`.
+
+    The gauges read the pool's own counters at scrape time. The wait is also
+    added to the `server_timing` phases of the current request.
+    """
+    pool = engine.pool
+    # Only queue pools keep counters, e.g. a NullPool opens a connection per use
+    if isinstance(pool, QueuePool):
+        db_pool_size.set_function(pool.size, name)
+        # The pool counts overflow from -size up, only the positive part is real
+        db_pool_overflow.set_function(lambda: max(0, pool.overflow()), name)
+        db_pool_checked_out.set_function(pool.checkedout, name)
+    event.listen(pool, "checkout", partial(_checkout_done, name))
+
+
+@event.listens_for(Session, "after_transaction_create")
+def _checkout_started(session: Session, transaction: SessionTransaction) -> None:
+    # A session opens a transaction, or a subtransaction for a flush, right
+    # before asking its engine for a connection
+    if not transaction.nested:
+        _checkout_start.set(time.perf_counter())
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _checkout_skipped(session: Session, transaction: SessionTransaction) -> None:
+    # The transaction ran on a connection the session already held
+    _checkout_start.set(None)
+
+
+def _checkout_done(name: str, dbapi_connection, connection_record, proxy) -> None:
+    # Fired once the pool hands the connection out, its pre-ping included
+    started = _checkout_start.get()
+    if started is None:
+        return
+    _checkout_start.set(None)
+    seconds = time.perf_counter() - started
+    db_pool_checkout_duration.observe(seconds, name)
+    timings = server_timing.current()
+    if timings is not None:
+        timings.add(server_timing.DB_CHECKOUT, seconds)
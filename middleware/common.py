@@ -0,0 +1,21 @@
+from litestar.types import Scope
+
+# Probes and scrapes skip the request middlewares: they need no user, and
+# logging every call would drown the real traffic.
+UNINSTRUMENTED_PATHS = ("^/health/", "^/metrics$")
+
+
+def get_header(scope: Scope, name: bytes) -> bytes | None:
+    """Value of the first `name` header, `name` in lower case like ASGI sends it.
+
+    One pass over the raw header list, without building a dict of all of them.
+    """
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def get_method(scope: Scope) -> str:
+    """HTTP method of the request, empty for a websocket scope which has none."""
+    return scope.get("method", "")
@@ -0,0 +1,45 @@
+import time
+
+from litestar.enums import ScopeType
+from litestar.exceptions import HTTPException
+from litestar.middleware import ASGIMiddleware
+from litestar.types import Message, Scope, Receive, Send, ASGIApp
+
+import metrics
+from middleware.common import UNINSTRUMENTED_PATHS, get_method
+
+
+class MetricsMiddleware(ASGIMiddleware):
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = UNINSTRUMENTED_PATHS
+
+    async def handle(
+        self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
+    ) -> None:
+        """Count in-flight requests and observe their latency per route.
+
+        Routes are labelled by their template (`/museums/{museum_id:uuid}`),
+        not the raw path, to keep the number of series bounded.
+        """
+        method = get_method(scope)
+        route = scope["path_template"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_flight.inc(method, route)
+        try:
+            await next_app(scope, receive, send_wrapper)
+        except HTTPException as exc:
+            status = exc.status_code
+            raise
+        finally:
+            metrics.http_requests_in_flight.dec(method, route)
+            metrics.http_request_duration.observe(
+                time.perf_counter() - start, method, route, str(status)
+            )
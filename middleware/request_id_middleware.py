@@ -1,14 +1,60 @@
+import re
+import time
 from uuid import uuid4
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+from litestar.exceptions import HTTPException
 from litestar.middleware import ASGIMiddleware
-from litestar.types import Scope, Receive, Send, ASGIApp
+from litestar.types import Message, Scope, Receive, Send, ASGIApp
 from loguru import logger
 
+from middleware.common import UNINSTRUMENTED_PATHS, get_header, get_method
+
+# Accept ids from a proxy or client as long as they are short, printable ASCII
+_VALID_REQUEST_ID = re.compile(rb"[\x21-\x7e]{1,128}")
+
 
 class RequestIDMiddleware(ASGIMiddleware):
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = UNINSTRUMENTED_PATHS
+
     async def handle(
         self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
     ) -> None:
-        """Add a request id to incoming requests logs."""
-        request_id = str(uuid4())
+        """Add a request id to incoming requests logs, and log one access line.
+
+        Reuses the X-Request-ID of the incoming request when there is one, so
+        our logs line up with the proxy's, and sends it back in the response.
+        """
+        incoming = get_header(scope, b"x-request-id")
+        if incoming is not None and _VALID_REQUEST_ID.fullmatch(incoming):
+            request_id = incoming.decode("ascii")
+        else:
+            request_id = str(uuid4())
+        scope["state"]["request_id"] = request_id
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableScopeHeaders.from_message(message)["x-request-id"] = request_id
+            await send(message)
+
         with logger.contextualize(request_id=request_id):
-            await next_app(scope, receive, send)
+            try:
+                await next_app(scope, receive, send_wrapper)
+            except HTTPException as exc:
+                # Raised by an inner middleware, turned into a response upstream
+                status = exc.status_code
+                raise
+            finally:
+                logger.info(
+                    "{} {} {} {:.1f}ms",
+                    get_method(scope),
+                    scope["path"],
+                    status,
+                    (time.perf_counter() - start) * 1000,
+                )
@@ -0,0 +1,53 @@
+import time
+
+from litestar import Response
+from litestar.datastructures import MutableScopeHeaders
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import Message, Scope, Receive, Send, ASGIApp
+from loguru import logger
+
+import server_timing
+from middleware.common import UNINSTRUMENTED_PATHS, get_method
+
+
+class ServerTimingMiddleware(ASGIMiddleware):
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = UNINSTRUMENTED_PATHS
+
+    async def handle(
+        self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
+    ) -> None:
+        """Time the phases of the request, see `server_timing`.
+
+        Sends them in a Server-Timing header and logs them. Inside
+        `RequestIDMiddleware`, so the log line carries the request id.
+        """
+        timings = server_timing.start_request()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Response rendering, started by the after_request hook
+                timings.stop("serialize")
+                headers = MutableScopeHeaders.from_message(message)
+                headers["server-timing"] = timings.to_header(
+                    time.perf_counter() - start
+                )
+            await send(message)
+
+        try:
+            await next_app(scope, receive, send_wrapper)
+        finally:
+            logger.bind(timings=timings.to_log(time.perf_counter() - start)).info(
+                "Server timing {} {}", get_method(scope), scope["path"]
+            )
+
+
+async def start_render_timing(response: Response) -> Response:
+    """`after_request` hook: the response is rendered between now and the
+    moment its headers are sent."""
+    timings = server_timing.current()
+    if timings is not None:
+        timings.start("serialize")
+    return response
@@ -0,0 +1,24 @@
+from litestar.types import Middleware
+
+from middleware.metrics_middleware import MetricsMiddleware
+from middleware.request_id_middleware import RequestIDMiddleware
+from middleware.server_timing_middleware import ServerTimingMiddleware
+from middleware.user_check_middleware import UserCheckMiddleware
+
+
+def create_middleware_stack(server_timing: bool = False) -> list[Middleware]:
+    """The application's middlewares, outermost first.
+
+    Litestar's `LoggingMiddleware` is left out, it cost more than the rest of
+    the stack. `RequestIDMiddleware` logs one line per request instead.
+    `MetricsMiddleware` comes before the user check so rejected requests are
+    measured too.
+    """
+    if server_timing:
+        return [
+            RequestIDMiddleware(),
+            MetricsMiddleware(),
+            ServerTimingMiddleware(),
+            UserCheckMiddleware(),
+        ]
+    return [RequestIDMiddleware(), MetricsMiddleware(), UserCheckMiddleware()]
@@ -1,24 +1,29 @@
 from uuid import UUID
 
+from litestar.enums import ScopeType
 from litestar.exceptions import NotAuthorizedException
 from litestar.middleware import ASGIMiddleware
 from litestar.types import Scope, Receive, Send, ASGIApp
 
+from middleware.common import UNINSTRUMENTED_PATHS, get_header
+
 
 class UserCheckMiddleware(ASGIMiddleware):
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = UNINSTRUMENTED_PATHS
+
     async def handle(
         self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp
     ) -> None:
         """Add the user_id to the request scope."""
-        headers = dict(scope["headers"])
-        user_id_bytes = headers.get(b"x-user-id")
+        user_id_bytes = get_header(scope, b"x-user-id")
 
         if not user_id_bytes:
             raise NotAuthorizedException(detail="Missing X-User-ID header")
 
         try:
             scope["user_id"] = UUID(user_id_bytes.decode("utf-8"))
-        except ValueError:
+        except (UnicodeDecodeError, ValueError):
             raise NotAuthorizedException(detail="Invalid X-User-ID header format")
 
         await next_app(scope, receive, send)
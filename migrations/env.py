@@ -24,6 +24,8 @@ from orm.models.base import Base
 
 # Import models to register them with metadata
 import orm.models.city
+import orm.models.city_stats
+import orm.models.load_checkpoint
 import orm.models.visitor_prediction
 import orm.models.museum
 import orm.models.user
@@ -0,0 +1,22 @@
+"""REVISION_HEADER"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2d7e4b9c1f6"
+down_revision: Union[str, None] = "f1c6a8e3b7d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Declared by the model but missing from the initial schema. The upserts
+    # on email (ON CONFLICT (email)) need it.
+    op.create_unique_constraint(op.f("uq_user_email"), "user", ["email"])
+
+
+def downgrade() -> None:
+    op.drop_constraint(op.f("uq_user_email"), "user", type_="unique")
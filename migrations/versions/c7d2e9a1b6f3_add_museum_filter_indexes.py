@@ -0,0 +1,40 @@
+"""REVISION_HEADER"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import advanced_alchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e9a1b6f3"
+down_revision: Union[str, None] = "b3c1d7e2f4a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The model has always had an owner, the initial schema missed the column
+    op.add_column(
+        "museum",
+        sa.Column(
+            "user_id", advanced_alchemy.types.guid.GUID(length=16), nullable=False
+        ),
+    )
+    op.create_index("ix_museum_city_id_id", "museum", ["city_id", "id"], unique=False)
+    op.create_index(
+        "ix_museum_population_id", "museum", ["population", "id"], unique=False
+    )
+    op.create_index("ix_museum_user_id_id", "museum", ["user_id", "id"], unique=False)
+    op.create_index(
+        "ix_museum_created_at_id", "museum", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_museum_created_at_id", table_name="museum")
+    op.drop_index("ix_museum_user_id_id", table_name="museum")
+    op.drop_index("ix_museum_population_id", table_name="museum")
+    op.drop_index("ix_museum_city_id_id", table_name="museum")
+    op.drop_column("museum", "user_id")
@@ -0,0 +1,79 @@
+"""REVISION_HEADER"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import advanced_alchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8f2c6e1b9"
+down_revision: Union[str, None] = "c7d2e9a1b6f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "city_stats",
+        sa.Column("id", advanced_alchemy.types.guid.GUID(length=16), nullable=False),
+        sa.Column(
+            "city_id", advanced_alchemy.types.guid.GUID(length=16), nullable=False
+        ),
+        sa.Column("museum_count", sa.Integer(), nullable=False),
+        sa.Column("museum_population_sum", sa.BigInteger(), nullable=False),
+        sa.Column("latest_predicted_visitors", sa.Integer(), nullable=True),
+        sa.Column(
+            "latest_prediction_at",
+            advanced_alchemy.types.datetime.DateTimeUTC(timezone=True),
+            nullable=True,
+        ),
+        sa.Column("sa_orm_sentinel", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            advanced_alchemy.types.datetime.DateTimeUTC(timezone=True),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            advanced_alchemy.types.datetime.DateTimeUTC(timezone=True),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["city_id"], ["city.id"], name=op.f("fk_city_stats_city_id_city")
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_city_stats")),
+        sa.UniqueConstraint("city_id", name=op.f("uq_city_stats_city_id")),
+        sa.CheckConstraint("museum_count >= 0", name="check_museum_count_non_negative"),
+    )
+
+    # Backfill from the existing rows, later writes keep it up to date
+    op.execute(
+        """
+        INSERT INTO city_stats (
+            id, city_id, museum_count, museum_population_sum,
+            latest_predicted_visitors, latest_prediction_at, created_at, updated_at
+        )
+        SELECT
+            gen_random_uuid(), city.id,
+            coalesce(museums.count, 0), coalesce(museums.population_sum, 0),
+            latest.predicted_visitors, latest.created_at, now(), now()
+        FROM city
+        LEFT JOIN (
+            SELECT city_id, count(*) AS count, sum(population) AS population_sum
+            FROM museum
+            GROUP BY city_id
+        ) AS museums ON museums.city_id = city.id
+        LEFT JOIN (
+            SELECT DISTINCT ON (city_id) city_id, predicted_visitors, created_at
+            FROM visitor_prediction
+            ORDER BY city_id, created_at DESC
+        ) AS latest ON latest.city_id = city.id
+        WHERE museums.city_id IS NOT NULL OR latest.city_id IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("city_stats")
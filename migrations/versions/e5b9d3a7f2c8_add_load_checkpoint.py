@@ -0,0 +1,42 @@
+"""REVISION_HEADER"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import advanced_alchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b9d3a7f2c8"
+down_revision: Union[str, None] = "d4a8f2c6e1b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "load_checkpoint",
+        sa.Column("id", advanced_alchemy.types.guid.GUID(length=16), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("source_size", sa.BigInteger(), nullable=False),
+        sa.Column("position", sa.BigInteger(), nullable=False),
+        sa.Column("rows_loaded", sa.BigInteger(), nullable=False),
+        sa.Column("sa_orm_sentinel", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            advanced_alchemy.types.datetime.DateTimeUTC(timezone=True),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            advanced_alchemy.types.datetime.DateTimeUTC(timezone=True),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_load_checkpoint")),
+        sa.UniqueConstraint("source", name=op.f("uq_load_checkpoint_source")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("load_checkpoint")
@@ -0,0 +1,50 @@
+"""REVISION_HEADER"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import advanced_alchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c6a8e3b7d4"
+down_revision: Union[str, None] = "e5b9d3a7f2c8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Earlier predictions were only stored per city, they keep a null museum
+    op.add_column(
+        "visitor_prediction",
+        sa.Column(
+            "museum_id", advanced_alchemy.types.guid.GUID(length=16), nullable=True
+        ),
+    )
+    op.create_foreign_key(
+        op.f("fk_visitor_prediction_museum_id_museum"),
+        "visitor_prediction",
+        "museum",
+        ["museum_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_visitor_prediction_museum_id_created_at",
+        "visitor_prediction",
+        ["museum_id", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_visitor_prediction_museum_id_created_at", table_name="visitor_prediction"
+    )
+    op.drop_constraint(
+        op.f("fk_visitor_prediction_museum_id_museum"),
+        "visitor_prediction",
+        type_="foreignkey",
+    )
+    op.drop_column("visitor_prediction", "museum_id")
@@ -0,0 +1,290 @@
+"""Bulk loading of museums through `COPY` and set-based merges.
+
+Rows are written in Postgres' binary `COPY` format to a temporary staging
+table, then merged into `city`, `museum` and `city_stats` with one statement
+each, whatever the number of rows.
+"""
+
+import struct
+from typing import Any, Iterable
+from uuid import UUID
+
+import psqlpy
+from sqlalchemy import (
+    ARRAY,
+    String,
+    Uuid,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid_utils.compat import uuid7
+
+from orm.models.city import City
+from orm.models.city_stats import CityStats
+from orm.models.load_checkpoint import LoadCheckpoint
+from orm.models.museum import Museum
+
+STAGING_TABLE = "museum_staging"
+
+# Dropped with the transaction, so a failed load leaves nothing behind
+_CREATE_STAGING_TABLE = text(
+    f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} "
+    "(id uuid NOT NULL, city text NOT NULL, population bigint NOT NULL) "
+    "ON COMMIT DROP"
+)
+
+_staging = table(STAGING_TABLE, column("id"), column("city"), column("population"))
+
+# Binary COPY: signature, flags and header extension length, then one tuple per
+# row (field count, then length and value of each field), then -1
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + bytes(8)
+_COPY_TRAILER = struct.pack(">h", -1)
+# Field count, the id (uuid) and the length of the city name (text)
+_ROW_START = struct.Struct(">hi16si")
+# The population (bigint)
+_ROW_END = struct.Struct(">iq")
+
+
+def encode_copy_rows(rows: Iterable[tuple[str, int]]) -> bytes:
+    """(city, population) rows in the binary COPY format of the staging table.
+
+    Museum ids are UUIDv7 like the ORM generates, so bulk loaded museums sort
+    by creation like the others.
+    """
+    parts = [_COPY_HEADER]
+    for city, population in rows:
+        name = city.encode()
+        parts.append(_ROW_START.pack(3, 16, uuid7().bytes, len(name)))
+        parts.append(name)
+        parts.append(_ROW_END.pack(8, population))
+    parts.append(_COPY_TRAILER)
+    return b"".join(parts)
+
+
+def _psqlpy_connection(driver_connection: Any) -> psqlpy.Connection:
+    """The psqlpy connection behind a pooled connection's `driver_connection`.
+
+    psqlpy-sqlalchemy (0.1) doesn't implement `Dialect.get_driver_connection`,
+    so `driver_connection` is its DB-API adapter, which keeps the psqlpy
+    connection in the private `_connection`. This is the only place relying
+    on it: once the dialect returns the psqlpy connection, it is used as is.
+    """
+    if isinstance(driver_connection, psqlpy.Connection):
+        return driver_connection
+    return driver_connection._connection
+
+
+async def stage_museums(session: AsyncSession, rows: Iterable[tuple[str, int]]) -> int:
+    """COPY (city, population) rows into the staging table of the transaction.
+
+    Returns the number of rows staged. Nothing reaches the museum tables
+    before `merge_staged_museums`.
+    """
+    await session.execute(_CREATE_STAGING_TABLE)
+    # COPY is not part of the DB-API, it goes through the psqlpy connection
+    # under the SQLAlchemy adapter. The statement above opened the transaction
+    # on it.
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    psqlpy_connection = _psqlpy_connection(raw_connection.driver_connection)
+    return await psqlpy_connection.binary_copy_to_table(
+        encode_copy_rows(rows),
+        STAGING_TABLE,
+        columns=["id", "city", "population"],
+    )
+
+
+async def merge_staged_museums(session: AsyncSession, user_id: UUID) -> int:
+    """Create the staged museums, owned by `user_id`, and empty the staging table.
+
+    Creates the missing cities first, then counts the museums into the
+    `city_stats` rollup. Returns the number of museums created.
+    """
+    cities = (await session.scalars(select(_staging.c.city).distinct())).all()
+    if not cities:
+        return 0
+    # UUIDv7 ids like the ORM's, for the city and city_stats rows of each
+    # staged city in case they don't exist yet. Passed as three arrays, so the
+    # statements keep the same number of parameters whatever the cities.
+    new_ids = (
+        func.unnest(
+            cast(literal(cities, ARRAY(String)), ARRAY(String)),
+            cast(literal([uuid7() for _ in cities], ARRAY(Uuid)), ARRAY(Uuid)),
+            cast(literal([uuid7() for _ in cities], ARRAY(Uuid)), ARRAY(Uuid)),
+        )
+        .table_valued("city", "city_id", "stats_id")
+        .render_derived(name="new_ids")
+    )
+
+    now = func.now()
+    await session.execute(
+        insert(City)
+        .from_select(
+            ["id", "name", "population", "created_at", "updated_at"],
+            select(
+                new_ids.c.city_id,
+                _staging.c.city,
+                func.max(_staging.c.population),
+                now,
+                now,
+            )
+            .join(new_ids, new_ids.c.city == _staging.c.city)
+            .group_by(_staging.c.city, new_ids.c.city_id),
+        )
+        .on_conflict_do_nothing(index_elements=[City.name])
+    )
+
+    # The driver's rowcount can't be trusted for `INSERT ... SELECT`, count the
+    # inserted rows in the same statement instead
+    inserted = (
+        insert(Museum)
+        .from_select(
+            ["id", "city_id", "population", "user_id", "created_at", "updated_at"],
+            select(
+                _staging.c.id,
+                City.id,
+                _staging.c.population,
+                literal(user_id, Uuid),
+                now,
+                now,
+            ).join(City, City.name == _staging.c.city),
+        )
+        .returning(Museum.id)
+        .cte("inserted")
+    )
+    count = await session.scalar(select(func.count()).select_from(inserted))
+
+    stats = insert(CityStats).from_select(
+        [
+            "id",
+            "city_id",
+            "museum_count",
+            "museum_population_sum",
+            "created_at",
+            "updated_at",
+        ],
+        select(
+            new_ids.c.stats_id,
+            City.id,
+            func.count(),
+            func.sum(_staging.c.population),
+            now,
+            now,
+        )
+        .join(City, City.name == _staging.c.city)
+        .join(new_ids, new_ids.c.city == _staging.c.city)
+        .group_by(City.id, new_ids.c.stats_id)
+        # Same lock order as `city_stats.add_museums`, so they can't deadlock
+        .order_by(City.id),
+    )
+    await session.execute(
+        stats.on_conflict_do_update(
+            index_elements=[CityStats.city_id],
+            set_={
+                "museum_count": CityStats.museum_count + stats.excluded.museum_count,
+                "museum_population_sum": CityStats.museum_population_sum
+                + stats.excluded.museum_population_sum,
+                "updated_at": stats.excluded.updated_at,
+            },
+        )
+    )
+
+    await session.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+    return count
+
+
+async def load_museums(
+    session: AsyncSession, rows: Iterable[tuple[str, int]], user_id: UUID
+) -> int:
+    """Stage and merge (city, population) museum rows in one go."""
+    await stage_museums(session, rows)
+    return await merge_staged_museums(session, user_id)
+
+
+async def delete_museums_of_user(session: AsyncSession, user_id: UUID) -> int:
+    """Delete every museum of `user_id` and take them out of the rollup.
+
+    Returns the number of museums deleted.
+    """
+    deleted = (
+        delete(Museum)
+        .where(Museum.user_id == user_id)
+        .returning(Museum.city_id, Museum.population)
+        .cte("deleted")
+    )
+    totals = (
+        select(
+            deleted.c.city_id,
+            func.count().label("museum_count"),
+            func.sum(deleted.c.population).label("museum_population_sum"),
+        )
+        .group_by(deleted.c.city_id)
+        .cte("totals")
+    )
+    updated = (
+        update(CityStats)
+        .where(CityStats.city_id == totals.c.city_id)
+        .values(
+            museum_count=CityStats.museum_count - totals.c.museum_count,
+            museum_population_sum=CityStats.museum_population_sum
+            - totals.c.museum_population_sum,
+            updated_at=func.now(),
+        )
+        .returning(CityStats.id)
+        .cte("updated")
+    )
+    # One statement, so the delete only runs once. Postgres runs the update
+    # although the select doesn't read it.
+    count = await session.scalar(
+        select(func.coalesce(func.sum(totals.c.museum_count), 0)).add_cte(updated)
+    )
+    return int(count)
+
+
+async def get_checkpoint(session: AsyncSession, source: str) -> LoadCheckpoint | None:
+    return await session.scalar(
+        select(LoadCheckpoint).where(LoadCheckpoint.source == source)
+    )
+
+
+async def save_checkpoint(
+    session: AsyncSession,
+    source: str,
+    source_size: int,
+    position: int,
+    rows_loaded: int,
+) -> None:
+    """Record how far the load of `source` got.
+
+    Save it in the transaction of the batch it follows, so a crash can neither
+    skip nor load a batch twice on resume.
+    """
+    stmt = insert(LoadCheckpoint).values(
+        source=source,
+        source_size=source_size,
+        position=position,
+        rows_loaded=rows_loaded,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LoadCheckpoint.source],
+        set_={
+            "source_size": stmt.excluded.source_size,
+            "position": stmt.excluded.position,
+            "rows_loaded": stmt.excluded.rows_loaded,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def delete_checkpoint(session: AsyncSession, source: str) -> None:
+    await session.execute(delete(LoadCheckpoint).where(LoadCheckpoint.source == source))
@@ -1,16 +1,124 @@
-from sqlalchemy import select
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import URL
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from caching.lru import LRUCache
 from orm.models.city import City
 
+CITY_CACHE_SIZE = 10_000
+
+# Ids of cities known to exist. Shared by the API and the worker, keyed by
+# database URL as well since a name maps to a different id in each database.
+_city_ids: LRUCache[tuple[URL, str], UUID] = LRUCache(maxsize=CITY_CACHE_SIZE)
+
+# Ids resolved in a transaction only enter the cache once it commits, a rolled
+# back insert must not leave the id of a city that doesn't exist behind.
+_PENDING_CITY_IDS = "pending_city_ids"
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_city_ids(session: Session) -> None:
+    for key, city_id in session.info.pop(_PENDING_CITY_IDS, {}).items():
+        _city_ids.set(key, city_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_city_ids(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_CITY_IDS, None)
+
+
+def _cache_key(session: AsyncSession, name: str) -> tuple[URL, str]:
+    return session.get_bind().engine.url, name
+
+
+def _get_cached_id(session: AsyncSession, name: str) -> UUID | None:
+    key = _cache_key(session, name)
+    return _city_ids.get(key) or session.info.get(_PENDING_CITY_IDS, {}).get(key)
+
+
+def _set_cached_id(session: AsyncSession, name: str, city_id: UUID) -> None:
+    pending = session.info.setdefault(_PENDING_CITY_IDS, {})
+    pending[_cache_key(session, name)] = city_id
+
+
+async def _attach_city(session: AsyncSession, city_id: UUID, name: str) -> City:
+    """Return a City for a known id without loading it from the database.
+
+    Only `id` and `name` are set, the other attributes are expired and would be
+    loaded on access.
+    """
+    city = City(id=city_id, name=name)
+    make_transient_to_detached(city)
+    return await session.merge(city, load=False)
+
+
+async def get_or_create_city_id(
+    session: AsyncSession, name: str, population: int
+) -> UUID:
+    """Return the id of the city called `name`, creating it if needed.
+
+    Cached cities cost no round trip, others a single upsert. `DO UPDATE`
+    (rather than `DO NOTHING`) makes the row lock wait for a concurrent insert
+    of the same name and return its id, so two requests creating the same new
+    city can no longer collide on the unique constraint.
+    """
+    city_id = _get_cached_id(session, name)
+    if city_id is not None:
+        return city_id
+
+    stmt = insert(City).values(name=name, population=population)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[City.name], set_={"name": stmt.excluded.name}
+    ).returning(City.id)
+    city_id = (await session.execute(stmt)).scalar_one()
+    _set_cached_id(session, name, city_id)
+    return city_id
+
 
 async def get_or_create_city(session: AsyncSession, name: str, population: int) -> City:
-    result = await session.execute(select(City).where(City.name == name))
-    city = result.scalars().first()
+    city_id = await get_or_create_city_id(session, name, population)
+    return await _attach_city(session, city_id, name)
+
+
+async def get_or_create_cities(
+    session: AsyncSession, populations: dict[str, int]
+) -> dict[str, City]:
+    """Resolve many city names at once, creating the missing ones.
+
+    Cached names are resolved in memory. For the others, one multi-row
+    `INSERT ... ON CONFLICT (name) DO NOTHING RETURNING` creates the new cities,
+    then a single lookup fetches the ones that already existed.
+    """
+    cities: dict[str, City] = {}
+    missing: dict[str, int] = {}
+    for name, population in populations.items():
+        city_id = _get_cached_id(session, name)
+        if city_id is None:
+            missing[name] = population
+        else:
+            cities[name] = await _attach_city(session, city_id, name)
+
+    if not missing:
+        return cities
+
+    stmt = (
+        insert(City).on_conflict_do_nothing(index_elements=[City.name]).returning(City)
+    )
+    result = await session.scalars(
+        stmt, [{"name": name, "population": pop} for name, pop in missing.items()]
+    )
+    created = {city.name: city for city in result.all()}
+
+    existing = missing.keys() - created.keys()
+    if existing:
+        result = await session.scalars(select(City).where(City.name.in_(existing)))
+        created.update((city.name, city) for city in result)
 
-    if not city:
-        city = City(name=name, population=population)
-        session.add(city)
-        await session.flush()
+    for name, city in created.items():
+        _set_cached_id(session, name, city.id)
 
-    return city
+    return cities | created
@@ -0,0 +1,117 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import Float, Row, cast, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from orm.models.city import City
+from orm.models.city_stats import CityStats
+
+
+async def add_museums(
+    session: AsyncSession, museums: Iterable[tuple[UUID, int]]
+) -> None:
+    """Count new (city id, population) museums into the rollup.
+
+    Call it in the transaction that inserts the museums so the rollup commits
+    or rolls back with them. Concurrent writers add to the same row, the
+    upsert's row lock serializes them.
+    """
+    totals: dict[UUID, list[int]] = defaultdict(lambda: [0, 0])
+    for city_id, population in museums:
+        totals[city_id][0] += 1
+        totals[city_id][1] += population
+    if not totals:
+        return
+
+    stmt = insert(CityStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CityStats.city_id],
+        set_={
+            "museum_count": CityStats.museum_count + stmt.excluded.museum_count,
+            "museum_population_sum": CityStats.museum_population_sum
+            + stmt.excluded.museum_population_sum,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    # Rows are locked in city id order, so two bulk writes can't deadlock
+    await session.execute(
+        stmt,
+        [
+            {
+                "city_id": city_id,
+                "museum_count": count,
+                "museum_population_sum": population_sum,
+            }
+            for city_id, (count, population_sum) in sorted(totals.items())
+        ],
+    )
+
+
+async def record_predictions(
+    session: AsyncSession,
+    predictions: Iterable[tuple[UUID, int]],
+    predicted_at: datetime,
+) -> None:
+    """Make (city id, predicted visitors) the latest predictions of the cities.
+
+    A city keeps a newer prediction that is already in. All the cities go in
+    one upsert, which can't update the same row twice, so a city predicted more
+    than once keeps its last prediction.
+    """
+    latest = dict(predictions)
+    if not latest:
+        return
+
+    stmt = insert(CityStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CityStats.city_id],
+        set_={
+            "latest_predicted_visitors": stmt.excluded.latest_predicted_visitors,
+            "latest_prediction_at": stmt.excluded.latest_prediction_at,
+            "updated_at": stmt.excluded.updated_at,
+        },
+        where=or_(
+            CityStats.latest_prediction_at.is_(None),
+            CityStats.latest_prediction_at <= stmt.excluded.latest_prediction_at,
+        ),
+    )
+    # Rows are locked in city id order, like `add_museums`
+    await session.execute(
+        stmt,
+        [
+            {
+                "city_id": city_id,
+                "museum_count": 0,
+                "museum_population_sum": 0,
+                "latest_predicted_visitors": predicted_visitors,
+                "latest_prediction_at": predicted_at,
+            }
+            for city_id, predicted_visitors in sorted(latest.items())
+        ],
+    )
+
+
+async def list_city_stats(session: AsyncSession) -> Sequence[Row]:
+    """One row per city from the rollup, no scan of the museums."""
+    stmt = (
+        select(
+            City.name.label("city"),
+            City.population.label("city_population"),
+            CityStats.museum_count,
+            CityStats.museum_population_sum,
+            (
+                cast(CityStats.museum_population_sum, Float)
+                / func.nullif(CityStats.museum_count, 0)
+            ).label("museum_population_avg"),
+            CityStats.latest_predicted_visitors,
+            CityStats.latest_prediction_at,
+        )
+        .join(City, CityStats.city_id == City.id)
+        .order_by(City.name)
+    )
+    result = await session.execute(stmt)
+    return result.all()
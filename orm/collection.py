@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from advanced_alchemy.base import UUIDv7AuditBase
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass(frozen=True)
+class CollectionVersion:
+    """Changes whenever a row of the collection is created or updated."""
+
+    last_modified: datetime | None
+    count: int
+
+    def to_bytes(self) -> bytes:
+        last_modified = self.last_modified.isoformat() if self.last_modified else ""
+        return f"{last_modified}|{self.count}".encode()
+
+    @classmethod
+    def from_bytes(cls, value: bytes) -> "CollectionVersion":
+        last_modified, count = value.decode().split("|")
+        return cls(
+            last_modified=datetime.fromisoformat(last_modified)
+            if last_modified
+            else None,
+            count=int(count),
+        )
+
+
+async def get_collection_version(
+    session: AsyncSession, model: type[UUIDv7AuditBase]
+) -> CollectionVersion:
+    """Return the version of a whole table from its updated_at index."""
+    stmt = select(func.max(model.updated_at), func.count()).select_from(model)
+    last_modified, count = (await session.execute(stmt)).one()
+    return CollectionVersion(last_modified=last_modified, count=count)
@@ -0,0 +1,28 @@
+from datetime import datetime
+from uuid import UUID
+from advanced_alchemy.types import DateTimeUTC
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from orm.models.base import Base
+from orm.models.city import City
+
+
+class CityStats(Base):
+    """Per-city rollup of museums and predictions, kept up to date on write."""
+
+    __tablename__ = "city_stats"
+
+    city_id: Mapped[UUID] = mapped_column(
+        ForeignKey("city.id"), unique=True, nullable=False
+    )
+    museum_count: Mapped[int] = mapped_column(
+        CheckConstraint("museum_count >= 0", name="check_museum_count_non_negative"),
+        nullable=False,
+    )
+    museum_population_sum: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    latest_predicted_visitors: Mapped[int | None] = mapped_column(nullable=True)
+    latest_prediction_at: Mapped[datetime | None] = mapped_column(
+        DateTimeUTC(timezone=True), nullable=True
+    )
+
+    city: Mapped[City] = relationship()
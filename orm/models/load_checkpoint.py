@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from orm.models.base import Base
+
+
+class LoadCheckpoint(Base):
+    """How far a bulk load got into its source file, committed with each batch."""
+
+    __tablename__ = "load_checkpoint"
+
+    source: Mapped[str] = mapped_column(unique=True, nullable=False)
+    # Size of the file when the load started, a different file must not resume
+    source_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Byte offset (JSONL, CSV) or row index (Parquet) to resume from
+    position: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    rows_loaded: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import ForeignKey, CheckConstraint
+from sqlalchemy import ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from orm.models.base import UserAuditBase
 from orm.models.city import City
@@ -7,6 +7,14 @@ from orm.models.city import City
 
 class Museum(UserAuditBase):
     __tablename__ = "museum"
+    __table_args__ = (
+        Index("ix_museum_updated_at", "updated_at"),
+        # List filters and sort keys, with the id as keyset tie-breaker
+        Index("ix_museum_city_id_id", "city_id", "id"),
+        Index("ix_museum_population_id", "population", "id"),
+        Index("ix_museum_user_id_id", "user_id", "id"),
+        Index("ix_museum_created_at_id", "created_at", "id"),
+    )
 
     city_id: Mapped[UUID] = mapped_column(ForeignKey("city.id"), nullable=False)
     population: Mapped[int] = mapped_column(
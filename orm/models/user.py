@@ -1,10 +1,11 @@
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from orm.models.base import Base
 
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (Index("ix_user_updated_at", "updated_at"),)
     name: Mapped[str] = mapped_column(
         CheckConstraint("char_length(name) >= 1", name="check_user_name_non_empty"),
         nullable=False,
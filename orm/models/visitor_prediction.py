@@ -1,5 +1,5 @@
 from uuid import UUID
-from sqlalchemy import ForeignKey, CheckConstraint
+from sqlalchemy import ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from orm.models.base import Base
 from orm.models.city import City
@@ -7,7 +7,15 @@ from orm.models.city import City
 
 class VisitorPrediction(Base):
     __tablename__ = "visitor_prediction"
+    __table_args__ = (
+        # Latest prediction of a museum
+        Index("ix_visitor_prediction_museum_id_created_at", "museum_id", "created_at"),
+    )
 
+    # Predictions outlive their museum, they still count for the city
+    museum_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("museum.id", ondelete="SET NULL"), nullable=True
+    )
     city_id: Mapped[UUID] = mapped_column(ForeignKey("city.id"), nullable=False)
     predicted_visitors: Mapped[int] = mapped_column(
         CheckConstraint(
@@ -1,36 +1,238 @@
-from typing import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from enum import StrEnum
+from typing import AsyncIterator, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Row, Select, Uuid, any_, bindparam, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from api_models.museum import MuseumCreate
+from caching.query_cache import QueryCache
+from orm.models.city import City
 from orm.models.museum import Museum
-from orm.city import get_or_create_city
+from orm import city_stats
+from orm.city import get_or_create_city, get_or_create_cities
 
 
 async def create_museum(
-    session: AsyncSession, data: MuseumCreate, user_id: UUID
+    session: AsyncSession,
+    data: MuseumCreate,
+    user_id: UUID,
+    cache: QueryCache | None = None,
 ) -> Museum:
     # Check/Create City
     city = await get_or_create_city(session, data.city, data.population)
 
-    museum = Museum(city_id=city.id, population=data.population, user_id=user_id)
+    # All columns are generated client side, no refresh needed after the insert
+    museum = Museum(city=city, population=data.population, user_id=user_id)
     session.add(museum)
     await session.flush()
-    await session.refresh(museum)
+    await city_stats.add_museums(session, [(city.id, museum.population)])
 
-    # Manually assign relationship for return (avoid extra DB hit if refresh doesn't do it)
-    museum.city = city
+    if cache is not None:
+        cache.invalidate_on_commit(session)
 
     return museum
 
 
-async def list_museums(session: AsyncSession) -> Sequence[Museum]:
-    result = await session.execute(select(Museum).options(joinedload(Museum.city)))
+async def create_museums(
+    session: AsyncSession,
+    data: Sequence[MuseumCreate],
+    user_id: UUID,
+    cache: QueryCache | None = None,
+) -> Sequence[Museum]:
+    """Create many museums with set-based statements instead of one per row."""
+    if not data:
+        return []
+
+    populations: dict[str, int] = {}
+    for item in data:
+        populations.setdefault(item.city, item.population)
+    cities = await get_or_create_cities(session, populations)
+
+    # SQLAlchemy batches this into multi-row INSERT ... RETURNING statements.
+    # Returned in the order of `data`, the callers zip them with their input.
+    result = await session.scalars(
+        insert(Museum).returning(Museum, sort_by_parameter_order=True),
+        [
+            {
+                "city_id": cities[item.city].id,
+                "population": item.population,
+                "user_id": user_id,
+            }
+            for item in data
+        ],
+    )
+    museums = result.all()
+
+    # Attach the already loaded cities without another round trip
+    cities_by_id = {city.id: city for city in cities.values()}
+    for museum in museums:
+        set_committed_value(museum, "city", cities_by_id[museum.city_id])
+    await city_stats.add_museums(
+        session, [(museum.city_id, museum.population) for museum in museums]
+    )
+
+    if cache is not None:
+        cache.invalidate_on_commit(session)
+
+    return museums
+
+
+class MuseumSort(StrEnum):
+    ID = "id"
+    CREATED_AT = "created_at"
+    POPULATION = "population"
+
+
+class SortOrder(StrEnum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+@dataclass(frozen=True)
+class MuseumFilter:
+    """Filters for museum lists, each one backed by an index on `museum`."""
+
+    city: str | None = None
+    min_population: int | None = None
+    max_population: int | None = None
+    user_id: UUID | None = None
+    created_after: datetime | None = None
+
+
+def _list_query(
+    stmt: Select,
+    limit: int | None,
+    after: UUID | None,
+    filters: MuseumFilter | None,
+    sort: MuseumSort,
+    order: SortOrder,
+) -> Select:
+    """Apply filters, ordering and the keyset seek to a museum select.
+
+    Rows are ordered on (sort column, id) so the order is total even on a
+    non-unique column. The cursor stays a museum id: the seek compares against
+    that museum's own (sort column, id), which the (column, id) indexes serve
+    in both directions.
+    """
+    if filters is not None:
+        if filters.city is not None:
+            stmt = stmt.where(
+                Museum.city_id
+                == select(City.id).where(City.name == filters.city).scalar_subquery()
+            )
+        if filters.min_population is not None:
+            stmt = stmt.where(Museum.population >= filters.min_population)
+        if filters.max_population is not None:
+            stmt = stmt.where(Museum.population <= filters.max_population)
+        if filters.user_id is not None:
+            stmt = stmt.where(Museum.user_id == filters.user_id)
+        if filters.created_after is not None:
+            stmt = stmt.where(Museum.created_at > filters.created_after)
+
+    if sort is MuseumSort.ID:
+        keys = [Museum.id]
+        cursor = after
+    else:
+        # Compare rows, (column, id) > (SELECT column, id FROM museum WHERE id = after)
+        keys = [getattr(Museum, sort.value), Museum.id]
+        seek = aliased(Museum)
+        cursor = (
+            select(getattr(seek, sort.value), seek.id)
+            .where(seek.id == after)
+            .scalar_subquery()
+        )
+    if after is not None:
+        key = tuple_(*keys) if len(keys) > 1 else keys[0]
+        stmt = stmt.where(key > cursor if order is SortOrder.ASC else key < cursor)
+
+    if order is SortOrder.DESC:
+        keys = [key.desc() for key in keys]
+    stmt = stmt.order_by(*keys)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def list_museums(
+    session: AsyncSession,
+    limit: int | None = None,
+    after: UUID | None = None,
+    filters: MuseumFilter | None = None,
+    sort: MuseumSort = MuseumSort.ID,
+    order: SortOrder = SortOrder.ASC,
+) -> Sequence[Museum]:
+    """List museums in sort order, optionally starting after a given museum id.
+
+    Ids are UUIDv7, so the default id order is creation order and the
+    `id > after` seek stays on the primary key index however deep we page.
+    """
+    stmt = select(Museum).options(joinedload(Museum.city))
+    stmt = _list_query(stmt, limit, after, filters, sort, order)
+
+    result = await session.execute(stmt)
     return result.scalars().all()
 
 
+async def list_museum_rows(
+    session: AsyncSession,
+    limit: int | None = None,
+    after: UUID | None = None,
+    filters: MuseumFilter | None = None,
+    sort: MuseumSort = MuseumSort.ID,
+    order: SortOrder = SortOrder.ASC,
+) -> Sequence[Row[tuple[UUID, str, int]]]:
+    """Like `list_museums`, but as plain (id, city, population) rows.
+
+    Skips ORM hydration and the identity map, for reads that only serialize
+    the result.
+    """
+    stmt = select(Museum.id, City.name.label("city"), Museum.population).join(
+        City, Museum.city_id == City.id
+    )
+    stmt = _list_query(stmt, limit, after, filters, sort, order)
+
+    result = await session.execute(stmt)
+    return result.all()
+
+
+async def stream_museums(
+    session: AsyncSession, batch_size: int = 500
+) -> AsyncIterator[Sequence[Museum]]:
+    """Stream all museums in id order, `batch_size` rows at a time.
+
+    Rows are read from a server-side cursor so memory stays bounded by the
+    batch size rather than the table size.
+    """
+    stmt = (
+        select(Museum)
+        .options(joinedload(Museum.city))
+        .order_by(Museum.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream_scalars(stmt)
+    async for museums in result.partitions():
+        yield museums
+
+
 async def get_museum(session: AsyncSession, museum_id: UUID) -> Museum | None:
     return await session.get(Museum, museum_id, options=[joinedload(Museum.city)])
+
+
+async def get_museum_populations(
+    session: AsyncSession, museum_ids: Sequence[UUID]
+) -> Sequence[Row[tuple[UUID, UUID, int]]]:
+    """(id, city id, population) of the museums that exist among `museum_ids`.
+
+    `= ANY` binds one array, the statement is the same for any number of ids.
+    """
+    stmt = select(Museum.id, Museum.city_id, Museum.population).where(
+        Museum.id == any_(bindparam("museum_ids", museum_ids, type_=ARRAY(Uuid)))
+    )
+    result = await session.execute(stmt)
+    return result.all()
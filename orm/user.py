@@ -1,11 +1,51 @@
 from uuid import UUID
-from typing import Sequence
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import URL
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from caching.lru import TTLCache
 from orm.models.user import User
-from api_models.user import ApiUserIn
+from api_models.user import ApiUserIn, ApiUserOut
+
+USER_CACHE_SIZE = 10_000
+USER_CACHE_TTL = 30
+
+# Users resolved for authentication, keyed by database URL and user id. The
+# cache is per process: a change made by another process shows up here once
+# the entry expires.
+_users: TTLCache[tuple[URL, UUID], ApiUserOut] = TTLCache(
+    maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+)
+
+# Users changed in a transaction are dropped again once it commits, in case a
+# concurrent request cached the old row in the meantime.
+_STALE_USER_IDS = "stale_user_ids"
+_LOADED_USERS = "loaded_users"
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_committed_users(session: Session) -> None:
+    for key in session.info.pop(_STALE_USER_IDS, ()):
+        _users.delete(key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_stale_user_ids(session: Session, previous_transaction) -> None:
+    session.info.pop(_STALE_USER_IDS, None)
+
+
+def _cache_key(session: AsyncSession, user_id: UUID) -> tuple[URL, UUID]:
+    return session.get_bind().engine.url, user_id
+
+
+def _invalidate(session: AsyncSession, user_id: UUID) -> None:
+    key = _cache_key(session, user_id)
+    _users.delete(key)
+    session.info.setdefault(_STALE_USER_IDS, set()).add(key)
 
 
 async def create_user(session: AsyncSession, data: ApiUserIn) -> User:
@@ -13,6 +53,7 @@ async def create_user(session: AsyncSession, data: ApiUserIn) -> User:
     session.add(user)
     await session.flush()
     await session.refresh(user)
+    _invalidate(session, user.id)
     return user
 
 
@@ -20,6 +61,40 @@ async def get_user(session: AsyncSession, user_id: UUID) -> User | None:
     return await session.get(User, user_id)
 
 
+async def get_or_create_user_id(session: AsyncSession, name: str, email: str) -> UUID:
+    """Return the id of the user with `email`, creating it if needed.
+
+    For accounts owned by scripts, e.g. the data pipeline. Like
+    `get_or_create_city_id`, `DO UPDATE` returns the id of a concurrent insert.
+    """
+    stmt = insert(User).values(name=name, email=email)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.email], set_={"email": stmt.excluded.email}
+    ).returning(User.id)
+    return (await session.execute(stmt)).scalar_one()
+
+
+async def get_cached_user(session: AsyncSession, user_id: UUID) -> ApiUserOut | None:
+    """Return a snapshot of the user for authentication, from the cache if we can.
+
+    A hit costs no query and no connection checkout. Unknown ids are not cached.
+    """
+    key = _cache_key(session, user_id)
+    cached = _users.get(key)
+    if cached is not None:
+        return cached
+
+    user = await get_user(session, user_id)
+    if user is None:
+        return None
+    # The identity map only holds weak references. Keep the user alive with the
+    # session so a handler sharing it gets the same row without a query.
+    session.info.setdefault(_LOADED_USERS, []).append(user)
+    cached = ApiUserOut.model_validate(user)
+    _users.set(key, cached)
+    return cached
+
+
 
 async def list_users(session: AsyncSession) -> Sequence[User]:
     stmt = select(User)
@@ -27,6 +102,25 @@ async def list_users(session: AsyncSession) -> Sequence[User]:
     return results.scalars().all()
 
 
+async def list_user_rows(
+    session: AsyncSession,
+) -> Sequence[Row[tuple[str, str, bool, UUID]]]:
+    """Like `list_users`, but as plain (name, email, is_admin, id) rows."""
+    stmt = select(User.name, User.email, User.is_admin, User.id)
+    results = await session.execute(stmt)
+    return results.all()
+
+
+async def stream_users(
+    session: AsyncSession, batch_size: int = 500
+) -> AsyncIterator[Sequence[User]]:
+    """Stream all users from a server-side cursor, `batch_size` rows at a time."""
+    stmt = select(User).order_by(User.id).execution_options(yield_per=batch_size)
+    result = await session.stream_scalars(stmt)
+    async for users in result.partitions():
+        yield users
+
+
 async def update_user(
     session: AsyncSession, user_id: UUID, data: ApiUserIn
 ) -> User | None:
@@ -42,4 +136,5 @@ async def update_user(
         user.is_admin = data.is_admin
 
     await session.flush()
-    return user
\ No newline at end of file
+    _invalidate(session, user_id)
+    return user
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from orm import city_stats
+from orm.models.visitor_prediction import VisitorPrediction
+
+
+async def create_predictions(
+    session: AsyncSession,
+    predictions: Sequence[tuple[UUID, UUID, int]],
+    predicted_at: datetime,
+) -> None:
+    """Store (museum id, city id, predicted visitors) predictions.
+
+    One multi-row INSERT, then one upsert makes them the latest prediction of
+    their cities.
+    """
+    if not predictions:
+        return
+
+    await session.execute(
+        insert(VisitorPrediction).values(
+            [
+                {
+                    "museum_id": museum_id,
+                    "city_id": city_id,
+                    "predicted_visitors": predicted_visitors,
+                    "created_at": predicted_at,
+                }
+                for museum_id, city_id, predicted_visitors in predictions
+            ]
+        )
+    )
+    await city_stats.record_predictions(
+        session,
+        [(city_id, visitors) for _, city_id, visitors in predictions],
+        predicted_at,
+    )
+
+
+async def get_latest_prediction(
+    session: AsyncSession, museum_id: UUID
+) -> VisitorPrediction | None:
+    stmt = (
+        select(VisitorPrediction)
+        .where(VisitorPrediction.museum_id == museum_id)
+        .order_by(VisitorPrediction.created_at.desc())
+        .limit(1)
+    )
+    return await session.scalar(stmt)
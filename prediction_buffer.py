@@ -0,0 +1,123 @@
+"""Write-behind buffer for the worker's predictions.
+
+Each task used to read its museum, then write its prediction in a transaction
+of its own. The buffer collects the museums of concurrent tasks for up to
+`interval` seconds, or `max_size` museums. It reads them with one query,
+predicts them in one batch and stores the predictions in one transaction.
+
+A task's `add` only returns once its prediction is committed, so the task is
+acknowledged after the write: a crash before the flush leaves the task to be
+redelivered, and a failed flush fails its tasks, which the worker retries (at
+least once). `close` flushes what is left on shutdown.
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Protocol
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from orm.museum import get_museum_populations
+from orm.visitor_prediction import create_predictions
+
+
+class Predictor(Protocol):
+    """Predicts the visitors of a city, like `inference.BatchPredictor`."""
+
+    async def predict(self, population: int) -> float: ...
+
+
+@dataclass(eq=False)
+class PredictionBuffer:
+    session_maker: async_sessionmaker
+    predictor: Predictor
+    max_size: int = 100
+    interval: float = 0.05
+    # Museums waiting for the next flush and the futures of their tasks
+    _museum_ids: list[UUID] = field(default_factory=list, init=False)
+    _futures: list[asyncio.Future[int | None]] = field(default_factory=list, init=False)
+    _timer: asyncio.TimerHandle | None = field(default=None, init=False)
+    _flushes: set[asyncio.Task] = field(default_factory=set, init=False)
+
+    async def add(self, museum_id: UUID) -> int | None:
+        """Predict the visitors of a museum and store the prediction.
+
+        Returns once the prediction is committed, with the predicted visitors,
+        or `None` if there is no such museum.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._museum_ids.append(museum_id)
+        self._futures.append(future)
+        if len(self._futures) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.interval, self._start_flush)
+        return await future
+
+    async def close(self) -> None:
+        """Flush the pending predictions and wait for the flushes in flight."""
+        if self._futures:
+            self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        museum_ids, self._museum_ids = self._museum_ids, []
+        futures, self._futures = self._futures, []
+
+        task = asyncio.get_running_loop().create_task(self._flush(museum_ids, futures))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(
+        self, museum_ids: list[UUID], futures: list[asyncio.Future[int | None]]
+    ) -> None:
+        try:
+            predictions = await self._write(museum_ids)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for museum_id, future in zip(museum_ids, futures):
+                if not future.done():
+                    future.set_result(predictions.get(museum_id))
+        finally:
+            # Cancelled during the write, e.g. at shutdown: the tasks are
+            # cancelled too instead of waiting forever
+            for future in futures:
+                future.cancel()
+
+    async def _write(self, museum_ids: list[UUID]) -> dict[UUID, int]:
+        # No connection is held while the batch is predicted
+        async with self.session_maker() as db:
+            museums = await get_museum_populations(db, list(set(museum_ids)))
+        if not museums:
+            return {}
+
+        outputs = await asyncio.gather(
+            *(self.predictor.predict(museum.population) for museum in museums)
+        )
+        predictions = {
+            museum.id: max(0, math.floor(output))
+            for museum, output in zip(museums, outputs)
+        }
+
+        async with self.session_maker() as db:
+            async with db.begin():
+                await create_predictions(
+                    db,
+                    [
+                        (museum.id, museum.city_id, predictions[museum.id])
+                        for museum in museums
+                    ],
+                    datetime.now(UTC),
+                )
+        return predictions
@@ -0,0 +1,72 @@
+"""Readiness of the API, checked in the background and served from memory."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+from litestar.status_codes import HTTP_200_OK, HTTP_503_SERVICE_UNAVAILABLE
+
+from api_models.base import json_encoder
+from clients.db_client import DBClient
+from clients.worker_client import WorkerClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReadinessStatus:
+    status_code: int
+    # Encoded once per check, probes send it as is
+    body: bytes
+
+    @classmethod
+    def not_ready(cls, detail: str) -> "ReadinessStatus":
+        return cls(
+            HTTP_503_SERVICE_UNAVAILABLE,
+            json_encoder.encode({"status": "not ready", "detail": detail}),
+        )
+
+
+READY = ReadinessStatus(HTTP_200_OK, json_encoder.encode({"status": "ready"}))
+
+
+@dataclass(eq=False)
+class Readiness:
+    """Checks the database and the task broker every `interval` seconds.
+
+    Probes read `status`, so however often they come they cost no query.
+    """
+
+    db_client: DBClient
+    worker_client: WorkerClient
+    interval: float
+    status: ReadinessStatus = field(
+        default=ReadinessStatus.not_ready("not checked yet"), init=False
+    )
+
+    async def check(self) -> ReadinessStatus:
+        try:
+            is_db_migrated = await self.db_client.check_migrations()
+        except Exception as e:
+            logger.warning(f"Readiness check could not reach the database: {e}")
+            return ReadinessStatus.not_ready("db unavailable")
+        if not is_db_migrated:
+            return ReadinessStatus.not_ready("db not migrated")
+
+        try:
+            await self.worker_client.ping()
+        except Exception as e:
+            logger.warning(f"Readiness check could not reach the broker: {e}")
+            return ReadinessStatus.not_ready("broker unavailable")
+
+        return READY
+
+    async def refresh(self) -> ReadinessStatus:
+        self.status = await self.check()
+        return self.status
+
+    async def run(self) -> None:
+        """Refresh the status until cancelled."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
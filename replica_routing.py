@@ -0,0 +1,33 @@
+"""Read-only requests read from a replica, see `clients.replicas`."""
+
+from dataclasses import dataclass
+
+from advanced_alchemy.extensions.litestar import SQLAlchemyAsyncConfig
+from litestar.datastructures import State
+from litestar.types import Scope
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from clients.replicas import READ_ENGINE, ReplicaSet
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+
+@dataclass
+class ReplicaRoutingConfig(SQLAlchemyAsyncConfig):
+    """Gives the sessions of read-only requests a replica to read from.
+
+    Takes effect with `RoutingSession` as the session class. Each request picks
+    one replica, so all of its reads see the same snapshot.
+    """
+
+    replicas: ReplicaSet | None = None
+
+    def provide_session(self, state: State, scope: Scope) -> AsyncSession:
+        session = super().provide_session(state, scope)
+        if (
+            self.replicas is not None
+            and scope.get("method") in READ_ONLY_METHODS
+            and READ_ENGINE not in session.info
+        ):
+            session.info[READ_ENGINE] = self.replicas.read_engine()
+        return session
@@ -0,0 +1,103 @@
+"""Per-request phase timings, reported in a Server-Timing header.
+
+Code marks phases with `phase("name")`. Outside a timed request (timing
+disabled, worker, scripts) it does nothing beyond a context variable lookup.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Generator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Waits for a pooled connection, timed by `metrics` with the pool metrics
+DB_CHECKOUT = "db-checkout"
+# Phase of the SQLAlchemy listeners below
+SQL = "sql"
+
+
+@dataclass
+class Phase:
+    seconds: float = 0.0
+    count: int = 0
+
+
+@dataclass
+class RequestTimings:
+    phases: dict[str, Phase] = field(default_factory=dict)
+    _started: dict[str, float] = field(default_factory=dict)
+
+    def add(self, name: str, seconds: float) -> None:
+        phase = self.phases.setdefault(name, Phase())
+        phase.seconds += seconds
+        phase.count += 1
+
+    def start(self, name: str) -> None:
+        self._started[name] = time.perf_counter()
+
+    def stop(self, name: str) -> None:
+        started = self._started.pop(name, None)
+        if started is not None:
+            self.add(name, time.perf_counter() - started)
+
+    def to_header(self, total: float) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        metrics = [
+            f'{name};dur={phase.seconds * 1000:.2f};desc="x{phase.count}"'
+            for name, phase in self.phases.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def to_log(self, total: float) -> dict[str, float]:
+        """Milliseconds per phase, for the structured log."""
+        timings = {name: round(p.seconds * 1000, 3) for name, p in self.phases.items()}
+        timings["total"] = round(total * 1000, 3)
+        return timings
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str) -> Generator[None]:
+    """Add the time spent in the block to the `name` phase of the request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("sql_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_done(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = _current.get()
+    started = conn.info.get("sql_started")
+    if timings is not None and started:
+        timings.add(SQL, time.perf_counter() - started.pop())
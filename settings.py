@@ -1,6 +1,11 @@
+from typing import Any, Literal
+
 from pydantic import PostgresDsn, computed_field, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+GraphOptimizationLevel = Literal["disable", "basic", "extended", "all"]
+ExecutionMode = Literal["sequential", "parallel"]
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -17,6 +22,119 @@ class Settings(BaseSettings):
     API_PORT: int = 8000
     db_type: str = Field(default="postgresql", description="Database type")
     driver: str = Field(default="psqlpy", description="Database driver")
+    DB_POOL_SIZE: int = Field(
+        default=10, description="Connections each engine keeps open"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=10, description="Extra connections an engine opens under load"
+    )
+    DB_POOL_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds to wait for a free connection before failing",
+    )
+    DB_POOL_RECYCLE: int = Field(
+        default=1800,
+        description="Seconds after which a connection is replaced, -1 to keep it",
+    )
+    DB_POOL_PRE_PING: bool = Field(
+        default=False,
+        description="Test connections on checkout, a round trip per checkout",
+    )
+    DB_REPLICA_URLS: list[str] = Field(
+        default_factory=list,
+        description="Read replicas of the museum database, with the driver like `db_url`",
+    )
+    DB_REPLICA_MAX_LAG: float = Field(
+        default=5.0, description="Seconds behind the primary a replica may serve reads"
+    )
+    DB_REPLICA_LAG_INTERVAL: float = Field(
+        default=1.0, description="Seconds between two measures of the replicas' lag"
+    )
+    CACHE_TTL: int = Field(
+        default=30, description="Seconds a cached museum read may be served"
+    )
+    CACHE_MAX_ENTRIES: int = Field(
+        default=1024, description="Max entries of the in-memory cache"
+    )
+    CACHE_REDIS_URL: str | None = Field(
+        default=None,
+        description="Share the cache through Redis instead of keeping it in memory (needs `redis`)",
+    )
+    SERVER_TIMING: bool = Field(
+        default=False,
+        description="Time request phases, send them in a Server-Timing header and log them",
+    )
+    METRICS_QUEUE_SAMPLE_INTERVAL: float = Field(
+        default=15.0, description="Seconds between two samples of the task queue depth"
+    )
+    READINESS_INTERVAL: float = Field(
+        default=5.0, description="Seconds between two background readiness checks"
+    )
+    INFERENCE_MAX_BATCH_SIZE: int = Field(
+        default=64, description="Predictions the worker runs through the model at once"
+    )
+    INFERENCE_MAX_WAIT_MS: float = Field(
+        default=0.0,
+        description="Milliseconds a prediction waits for others to share its batch, "
+        "0 batches the predictions of one event loop iteration",
+    )
+    INFERENCE_THREADS: int = Field(
+        default=1,
+        description="Threads the worker runs inference on, 0 runs it on the event loop",
+    )
+    ONNX_INTRA_OP_NUM_THREADS: int = Field(
+        default=0, description="Threads within an ONNX operator, 0 for one per core"
+    )
+    ONNX_INTER_OP_NUM_THREADS: int = Field(
+        default=0,
+        description="Threads across ONNX operators in parallel mode, 0 for the default",
+    )
+    ONNX_GRAPH_OPTIMIZATION_LEVEL: GraphOptimizationLevel = Field(
+        default="all", description="Graph optimizations applied when loading the model"
+    )
+    ONNX_EXECUTION_MODE: ExecutionMode = Field(
+        default="sequential",
+        description="Run independent operators of the graph one by one or in parallel",
+    )
+    PREDICTION_FLUSH_SIZE: int = Field(
+        default=100, description="Predictions the worker writes in one transaction"
+    )
+    PREDICTION_FLUSH_INTERVAL_MS: float = Field(
+        default=50.0,
+        description="Milliseconds a prediction waits for others to share its write",
+    )
+    WORKER_TASK_ATTEMPTS: int = Field(
+        default=3, description="Runs of a failing worker task, the first one included"
+    )
+    WORKER_METRICS_HOST: str = "0.0.0.0"
+    WORKER_METRICS_PORT: int = Field(
+        default=9100, description="Port the worker serves its /metrics on"
+    )
+
+    @property
+    def engine_options(self) -> dict[str, Any]:
+        """Pool options of `create_async_engine`, shared by every engine.
+
+        Each process opens up to `DB_POOL_SIZE + DB_MAX_OVERFLOW` connections
+        per engine, keep it under Postgres' `max_connections` across processes.
+        """
+        return {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+        }
+
+    @property
+    def onnx_session_options(self) -> dict[str, Any]:
+        """Keyword arguments for `inference.session_options`."""
+        return {
+            "intra_op_num_threads": self.ONNX_INTRA_OP_NUM_THREADS,
+            "inter_op_num_threads": self.ONNX_INTER_OP_NUM_THREADS,
+            "graph_optimization_level": self.ONNX_GRAPH_OPTIMIZATION_LEVEL,
+            "execution_mode": self.ONNX_EXECUTION_MODE,
+        }
 
     @computed_field
     @property
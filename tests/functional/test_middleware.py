@@ -0,0 +1,52 @@
+import pytest
+
+from litestar.status_codes import HTTP_200_OK, HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_health_needs_no_user(test_client):
+    response = await test_client.get("/health/live")
+    assert response.status_code == HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_missing_or_invalid_user_rejected(test_client):
+    response = await test_client.get("/museums")
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+
+    response = await test_client.get("/museums", headers={"X-User-ID": "not-a-uuid"})
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_incoming_request_id_accepted(authenticated_test_client):
+    response = await authenticated_test_client.get(
+        "/museums", headers={"X-Request-ID": "req-123"}
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["x-request-id"] == "req-123"
+
+    # An id that could forge log lines is replaced by a fresh one
+    response = await authenticated_test_client.get(
+        "/museums", headers={"X-Request-ID": "req 123"}
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["x-request-id"] not in ("", "req 123")
+
+
+@pytest.mark.asyncio
+async def test_metrics_scrape(authenticated_test_client):
+    await authenticated_test_client.get("/museums")
+
+    # Scrapes skip the user check, and are not measured themselves
+    response = await authenticated_test_client.get(
+        "/metrics", headers={"X-User-ID": "not-a-uuid"}
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/museums",status="200"}'
+        in response.text
+    )
+    assert 'route="/metrics"' not in response.text
+    assert 'db_pool_size{engine="api"}' in response.text
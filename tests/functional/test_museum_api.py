@@ -1,5 +1,20 @@
+import json
+from datetime import UTC, datetime
+
 import pytest
-from litestar.status_codes import HTTP_201_CREATED, HTTP_200_OK
+from uuid import UUID, uuid4
+
+from litestar.status_codes import (
+    HTTP_201_CREATED,
+    HTTP_200_OK,
+    HTTP_202_ACCEPTED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_404_NOT_FOUND,
+)
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from orm.models.museum import Museum
+from orm.visitor_prediction import create_predictions
 
 
 @pytest.mark.asyncio
@@ -11,6 +26,8 @@ async def test_create_museum_api(authenticated_test_client):
     data = response.json()
     assert data["city"] == "New York"
     assert "id" in data
+    # Enqueued, not waited for
+    assert data["prediction_task_id"]
 
 
 @pytest.mark.asyncio
@@ -23,6 +40,204 @@ async def test_list_museums_api(authenticated_test_client):
     response = await authenticated_test_client.get("/museums")
     assert response.status_code == HTTP_200_OK
     data = response.json()
-    assert isinstance(data, list)
-    assert len(data) == 1
-    assert data[0]["city"] == "Berlin"
+    assert isinstance(data["items"], list)
+    assert len(data["items"]) == 1
+    assert data["items"][0]["city"] == "Berlin"
+    assert data["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_museums_api_pagination(authenticated_test_client):
+    created_ids = []
+    for population in (100, 200, 300):
+        response = await authenticated_test_client.post(
+            "/museums", json={"city": "Rome", "population": population}
+        )
+        created_ids.append(response.json()["id"])
+
+    response = await authenticated_test_client.get("/museums", params={"limit": 2})
+    assert response.status_code == HTTP_200_OK
+    first_page = response.json()
+    assert [m["id"] for m in first_page["items"]] == created_ids[:2]
+    assert first_page["cursor"] == created_ids[1]
+
+    response = await authenticated_test_client.get(
+        "/museums", params={"limit": 2, "after": first_page["cursor"]}
+    )
+    second_page = response.json()
+    assert [m["id"] for m in second_page["items"]] == created_ids[2:]
+    assert second_page["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_stream_museums_api(authenticated_test_client):
+    for city in ("Oslo", "Lima"):
+        await authenticated_test_client.post(
+            "/museums", json={"city": city, "population": 1000}
+        )
+
+    response = await authenticated_test_client.get("/museums/stream")
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["city"] for row in rows] == ["Oslo", "Lima"]
+
+
+@pytest.mark.asyncio
+async def test_create_museums_bulk_api(authenticated_test_client):
+    # One of the cities already exists, the others are created by the bulk call
+    await authenticated_test_client.post(
+        "/museums", json={"city": "Madrid", "population": 3300000}
+    )
+    payload = [
+        {"city": "Madrid", "population": 10},
+        {"city": "Tokyo", "population": 20},
+        {"city": "Tokyo", "population": 30},
+    ]
+
+    response = await authenticated_test_client.post("/museums/bulk", json=payload)
+    assert response.status_code == HTTP_201_CREATED
+    created = response.json()
+    assert [(m["city"], m["population"]) for m in created] == [
+        (p["city"], p["population"]) for p in payload
+    ]
+
+    response = await authenticated_test_client.get("/museums")
+    assert len(response.json()["items"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_get_museum_api(authenticated_test_client):
+    response = await authenticated_test_client.post(
+        "/museums", json={"city": "Vienna", "population": 1000}
+    )
+    created = response.json()
+    # The task handle is only part of the create response
+    del created["prediction_task_id"]
+
+    response = await authenticated_test_client.get(f"/museums/{created['id']}")
+    assert response.status_code == HTTP_200_OK
+    assert response.json() == created
+
+    response = await authenticated_test_client.get(f"/museums/{uuid4()}")
+    assert response.status_code == HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_list_museums_api_not_stale_after_create(authenticated_test_client):
+    await authenticated_test_client.post(
+        "/museums", json={"city": "Prague", "population": 1000}
+    )
+    response = await authenticated_test_client.get("/museums")
+    assert len(response.json()["items"]) == 1
+
+    # The first list is cached now, the create must invalidate it
+    await authenticated_test_client.post(
+        "/museums", json={"city": "Prague", "population": 2000}
+    )
+    response = await authenticated_test_client.get("/museums")
+    assert len(response.json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_list_museums_api_conditional_get(authenticated_test_client):
+    await authenticated_test_client.post(
+        "/museums", json={"city": "Dublin", "population": 1000}
+    )
+    response = await authenticated_test_client.get("/museums")
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = await authenticated_test_client.get(
+        "/museums", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+    response = await authenticated_test_client.get(
+        "/museums", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == HTTP_304_NOT_MODIFIED
+
+    # Another page of the same collection has another ETag
+    response = await authenticated_test_client.get(
+        "/museums", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == HTTP_200_OK
+
+    await authenticated_test_client.post(
+        "/museums", json={"city": "Dublin", "population": 2000}
+    )
+    response = await authenticated_test_client.get(
+        "/museums", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == HTTP_200_OK
+    assert len(response.json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_list_museums_api_filters_and_sort(authenticated_test_client):
+    for city, population in [("Oslo", 50), ("Bergen", 10), ("Oslo", 30)]:
+        await authenticated_test_client.post(
+            "/museums", json={"city": city, "population": population}
+        )
+
+    response = await authenticated_test_client.get(
+        "/museums",
+        params={"city": "Oslo", "sort": "population", "order": "desc"},
+    )
+    assert response.status_code == HTTP_200_OK
+    assert [m["population"] for m in response.json()["items"]] == [50, 30]
+
+    response = await authenticated_test_client.get(
+        "/museums", params={"min_population": 20, "max_population": 40}
+    )
+    assert [m["population"] for m in response.json()["items"]] == [30]
+
+
+@pytest.mark.asyncio
+async def test_city_stats_api(authenticated_test_client):
+    await authenticated_test_client.post(
+        "/museums/bulk",
+        json=[
+            {"city": "Vienna", "population": 100},
+            {"city": "Vienna", "population": 300},
+        ],
+    )
+
+    response = await authenticated_test_client.get("/cities/stats")
+    assert response.status_code == HTTP_200_OK
+    [stats] = response.json()
+    assert stats["city"] == "Vienna"
+    assert stats["museum_count"] == 2
+    assert stats["museum_population_avg"] == 200
+
+
+@pytest.mark.asyncio
+async def test_museum_prediction_api(authenticated_test_client, db_client):
+    response = await authenticated_test_client.post(
+        "/museums", json={"city": "Madrid", "population": 1000}
+    )
+    museum_id = response.json()["id"]
+
+    response = await authenticated_test_client.get(
+        f"/museums/{museum_id}/prediction", params={"wait": 50}
+    )
+    assert response.status_code == HTTP_202_ACCEPTED
+    assert response.json()["status"] == "pending"
+
+    async with async_sessionmaker(db_client.engine)() as session:
+        museum = await session.get_one(Museum, UUID(museum_id))
+        await create_predictions(
+            session, [(museum.id, museum.city_id, 120)], datetime.now(UTC)
+        )
+        await session.commit()
+
+    response = await authenticated_test_client.get(f"/museums/{museum_id}/prediction")
+    assert response.status_code == HTTP_200_OK
+    data = response.json()
+    assert data["status"] == "done"
+    assert data["predicted_visitors"] == 120
+
+    response = await authenticated_test_client.get(f"/museums/{uuid4()}/prediction")
+    assert response.status_code == HTTP_404_NOT_FOUND
@@ -3,6 +3,10 @@ import httpx
 from polyfactory.factories.pydantic_factory import ModelFactory
 from api_models.user import ApiUserIn, ApiUserOut
 from uuid import UUID
+from sqlalchemy import event
+
+import app
+from orm import user as user_repo
 
 
 class UserCreateFactory(ModelFactory[ApiUserIn]):
@@ -66,3 +70,78 @@ async def test_update_user(
     updated_user = ApiUserOut.model_validate(response.json())
     assert updated_user.name == "Updated Name"
     assert updated_user.is_admin
+
+
+@pytest.mark.asyncio
+async def test_stream_users(
+    authenticated_test_client: httpx.AsyncClient, admin_user_id: str
+):
+    response = await authenticated_test_client.get("/users/stream")
+    assert response.status_code == 200
+    users = [
+        ApiUserOut.model_validate_json(line) for line in response.text.splitlines()
+    ]
+    assert [str(u.id) for u in users] == [admin_user_id]
+
+
+@pytest.mark.asyncio
+async def test_list_users_conditional_get(
+    authenticated_test_client: httpx.AsyncClient, admin_user_id: str
+):
+    response = await authenticated_test_client.get("/users")
+    etag = response.headers["etag"]
+
+    response = await authenticated_test_client.get(
+        "/users", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await authenticated_test_client.post(
+        "/users", json=UserCreateFactory.build().model_dump()
+    )
+    response = await authenticated_test_client.get(
+        "/users", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_admin_request_shares_one_session(
+    authenticated_test_client: httpx.AsyncClient, admin_user_id: str, db_client
+):
+    engine = db_client.engine.sync_engine
+    queries, checkouts = [], []
+
+    def count_query(conn, cursor, statement, *args):
+        queries.append(statement)
+
+    def count_checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    event.listen(engine.pool, "checkout", count_checkout)
+    try:
+        # Cold user cache: the guard loads the admin, the handler finds it in
+        # the identity map of the same session
+        user_repo._users.clear()
+        response = await authenticated_test_client.get(f"/users/{admin_user_id}")
+        assert response.status_code == 200
+        assert len(queries) == 1
+        assert len(checkouts) == 1
+
+        # Warm user cache: the guard needs no query, and whoami reads the user
+        # the guard put in the scope
+        queries.clear()
+        checkouts.clear()
+        response = await authenticated_test_client.get("/users/whoami")
+        assert response.status_code == 200
+        assert queries == []
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+        event.remove(engine.pool, "checkout", count_checkout)
+
+
+def test_api_process_has_one_engine():
+    # Request sessions, guards, health checks and streams share one pool
+    assert app.db_config.get_engine() is app.db_client.engine
@@ -0,0 +1,75 @@
+import pytest
+from uuid import uuid4
+
+from sqlalchemy import func, select
+
+from orm import bulk_load
+from orm import city_stats as city_stats_repo
+from orm import museum as museum_repo
+from orm.models.city import City
+from orm.models.city_stats import CityStats
+from orm.models.museum import Museum
+from tests.factories import MuseumCreateFactory
+
+
+@pytest.mark.asyncio
+async def test_load_museums_creates_cities_museums_and_stats(db_session):
+    # An existing city is reused, its stats are added to
+    await museum_repo.create_museum(
+        db_session, MuseumCreateFactory.build(city="Paris", population=10), uuid4()
+    )
+    await db_session.commit()
+
+    user_id = uuid4()
+    async with db_session.begin():
+        count = await bulk_load.load_museums(
+            db_session,
+            [("Paris", 20), ("Paris", 20), ("Zürich", 5)],
+            user_id,
+        )
+    assert count == 3
+
+    stats = {row.city: row for row in await city_stats_repo.list_city_stats(db_session)}
+    assert stats["Paris"].museum_count == 3
+    assert stats["Paris"].museum_population_sum == 50
+    assert stats["Paris"].city_population == 10
+    assert stats["Zürich"].museum_count == 1
+    assert stats["Zürich"].city_population == 5
+
+    owners = await db_session.scalar(
+        select(func.count()).where(Museum.user_id == user_id)
+    )
+    assert owners == 3
+
+    # Ids are UUIDv7 like the ORM's, the created cities' and stats' too
+    for model in (City, CityStats, Museum):
+        ids = await db_session.scalars(select(model.id))
+        assert {row_id.version for row_id in ids} == {7}
+
+
+@pytest.mark.asyncio
+async def test_reload_replaces_museums_of_user(db_session):
+    user_id = uuid4()
+    async with db_session.begin():
+        await bulk_load.load_museums(db_session, [("Paris", 20), ("Lyon", 5)], user_id)
+    async with db_session.begin():
+        deleted = await bulk_load.delete_museums_of_user(db_session, user_id)
+        await bulk_load.load_museums(db_session, [("Paris", 30)], user_id)
+    assert deleted == 2
+
+    stats = {row.city: row for row in await city_stats_repo.list_city_stats(db_session)}
+    assert stats["Paris"].museum_count == 1
+    assert stats["Paris"].museum_population_sum == 30
+    assert stats["Lyon"].museum_count == 0
+    assert stats["Lyon"].museum_population_sum == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_load_leaves_nothing_behind(db_session):
+    with pytest.raises(Exception):
+        async with db_session.begin():
+            await bulk_load.load_museums(db_session, [("Paris", 20)], uuid4())
+            raise RuntimeError
+
+    assert await city_stats_repo.list_city_stats(db_session) == []
+    assert await db_session.scalar(select(func.count()).select_from(Museum)) == 0
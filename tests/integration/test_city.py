@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from orm import city as city_repo
+from orm.models.city import City
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_or_create_city(db_client):
+    session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
+
+    async def create(population: int):
+        async with session_maker() as session:
+            city_id = await city_repo.get_or_create_city_id(
+                session, "Concurrent City", population
+            )
+            await session.commit()
+            return city_id
+
+    city_ids = await asyncio.gather(*(create(i) for i in range(10)))
+    assert len(set(city_ids)) == 1
+
+    async with session_maker() as session:
+        count = await session.scalar(select(func.count()).select_from(City))
+    assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_city_is_not_cached(db_session):
+    first_id = await city_repo.get_or_create_city_id(db_session, "Atlantis", 1)
+    await db_session.rollback()
+
+    second_id = await city_repo.get_or_create_city_id(db_session, "Atlantis", 1)
+    await db_session.commit()
+
+    assert first_id != second_id
+    assert await db_session.get(City, second_id) is not None
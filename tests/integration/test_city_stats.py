@@ -0,0 +1,59 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from orm import city_stats as city_stats_repo
+from orm import museum as museum_repo
+from tests.factories import MuseumCreateFactory
+
+
+@pytest.mark.asyncio
+async def test_city_stats_follow_museum_writes(db_session):
+    await museum_repo.create_museum(
+        db_session, MuseumCreateFactory.build(city="Paris", population=10), uuid4()
+    )
+    await museum_repo.create_museums(
+        db_session,
+        [
+            MuseumCreateFactory.build(city="Paris", population=20),
+            MuseumCreateFactory.build(city="Lyon", population=5),
+        ],
+        uuid4(),
+    )
+    await db_session.commit()
+
+    stats = {row.city: row for row in await city_stats_repo.list_city_stats(db_session)}
+    assert stats["Paris"].museum_count == 2
+    assert stats["Paris"].museum_population_sum == 30
+    assert stats["Paris"].museum_population_avg == 15
+    assert stats["Lyon"].museum_count == 1
+    assert stats["Lyon"].latest_predicted_visitors is None
+
+
+@pytest.mark.asyncio
+async def test_city_stats_rolled_back_with_museum(db_session):
+    await museum_repo.create_museum(
+        db_session, MuseumCreateFactory.build(city="Paris", population=10), uuid4()
+    )
+    await db_session.rollback()
+
+    assert await city_stats_repo.list_city_stats(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_city_stats_keep_latest_prediction(db_session):
+    museum = await museum_repo.create_museum(
+        db_session, MuseumCreateFactory.build(city="Paris", population=10), uuid4()
+    )
+    now = datetime.now(timezone.utc)
+    await city_stats_repo.record_predictions(db_session, [(museum.city_id, 100)], now)
+    # An older prediction processed late doesn't replace the latest one
+    await city_stats_repo.record_predictions(
+        db_session, [(museum.city_id, 50)], now - timedelta(minutes=1)
+    )
+    await db_session.commit()
+
+    [stats] = await city_stats_repo.list_city_stats(db_session)
+    assert stats.museum_count == 1
+    assert stats.latest_predicted_visitors == 100
+    assert stats.latest_prediction_at == now
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from onnxruntime import ExecutionMode, GraphOptimizationLevel
+
+from inference import BatchPredictor, session_options
+from settings import Settings
+
+
+class DoublingSession:
+    """Stands in for the ONNX model, predicts twice the population."""
+
+    def __init__(self):
+        self.batches: list[list[int]] = []
+
+    def run(self, output_names, inputs):
+        x_input = inputs["population"]
+        assert x_input.dtype == np.int64 and x_input.shape[1] == 1
+        self.batches.append(x_input[:, 0].tolist())
+        self.thread = threading.current_thread()
+        if 0 in self.batches[-1]:
+            raise RuntimeError("model failed")
+        return [x_input.astype(np.float32) * 2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predictions_share_one_run():
+    session = DoublingSession()
+    predictor = BatchPredictor(session)
+
+    results = await asyncio.gather(*(predictor.predict(p) for p in range(1, 6)))
+
+    assert results == [2, 4, 6, 8, 10]
+    assert session.batches == [[1, 2, 3, 4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_and_timed():
+    session = DoublingSession()
+    predictor = BatchPredictor(session, max_batch_size=2, max_wait=0.01)
+
+    results = await asyncio.gather(*(predictor.predict(p) for p in range(1, 6)))
+
+    assert results == [2, 4, 6, 8, 10]
+    # Full batches run right away, the last one once the wait is over
+    assert session.batches == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.asyncio
+async def test_failed_run_fails_its_batch_only():
+    session = DoublingSession()
+    predictor = BatchPredictor(session)
+
+    results = await asyncio.gather(
+        predictor.predict(0), predictor.predict(1), return_exceptions=True
+    )
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+
+    assert await predictor.predict(3) == 6
+
+
+@pytest.mark.asyncio
+async def test_batches_run_on_the_executor():
+    session = DoublingSession()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference") as executor:
+        predictor = BatchPredictor(session, executor=executor)
+
+        results = await asyncio.gather(*(predictor.predict(p) for p in range(1, 4)))
+        assert results == [2, 4, 6]
+        assert session.thread.name.startswith("inference")
+
+        with pytest.raises(RuntimeError):
+            await predictor.predict(0)
+
+
+def test_session_options_from_settings(monkeypatch):
+    monkeypatch.setenv("ONNX_INTRA_OP_NUM_THREADS", "2")
+    monkeypatch.setenv("ONNX_GRAPH_OPTIMIZATION_LEVEL", "basic")
+    monkeypatch.setenv("ONNX_EXECUTION_MODE", "parallel")
+
+    options = session_options(**Settings().onnx_session_options)
+
+    assert options.intra_op_num_threads == 2
+    assert options.inter_op_num_threads == 0
+    assert options.graph_optimization_level == GraphOptimizationLevel.ORT_ENABLE_BASIC
+    assert options.execution_mode == ExecutionMode.ORT_PARALLEL
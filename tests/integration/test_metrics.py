@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import text
+
+import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram(
+        "test_seconds", "Test", ("route",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    assert list(histogram.render()) == [
+        "# HELP test_seconds Test",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 1',
+        'test_seconds_bucket{route="/a",le="1"} 2',
+        'test_seconds_bucket{route="/a",le="+Inf"} 3',
+        'test_seconds_sum{route="/a"} 5.55',
+        'test_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_label_values_escaped():
+    gauge = metrics.Gauge("test_gauge", "Test", ("name",))
+    gauge.set(1, 'a"b\\c')
+
+    assert list(gauge.render())[-1] == 'test_gauge{name="a\\"b\\\\c"} 1'
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics(db_session):
+    metrics.instrument_engine(db_session.bind, "test_pool")
+
+    await db_session.execute(text("SELECT 1"))
+
+    rendered = metrics.REGISTRY.render()
+    assert 'db_pool_checked_out{engine="test_pool"} 1' in rendered
+    assert 'db_pool_checkout_seconds_count{engine="test_pool"} 1' in rendered
@@ -0,0 +1,104 @@
+import json
+import pytest
+from uuid import uuid4
+
+import polars as pl
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from clients.museum_import import import_museums
+from orm import city_stats as city_stats_repo
+from orm.models.museum import Museum
+
+
+async def count_museums(db_client) -> int:
+    async with async_sessionmaker(db_client.engine)() as session:
+        return await session.scalar(select(func.count()).select_from(Museum))
+
+
+@pytest.mark.asyncio
+async def test_import_jsonl_once(db_client, tmp_path):
+    path = tmp_path / "museums.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps({"city": city, "population": population})
+            for city, population in [("Paris", 10), ("Lyon", 5), ("Paris", 20)]
+        )
+        + "\n\n"
+    )
+
+    report = await import_museums(db_client.engine, path, uuid4(), batch_size=2)
+    assert (report.rows, report.total_rows) == (3, 3)
+
+    # A fully loaded file loads nothing again
+    report = await import_museums(db_client.engine, path, uuid4())
+    assert (report.rows, report.total_rows) == (0, 3)
+    assert await count_museums(db_client) == 3
+
+    async with async_sessionmaker(db_client.engine)() as session:
+        stats = {
+            row.city: row for row in await city_stats_repo.list_city_stats(session)
+        }
+    assert stats["Paris"].museum_count == 2
+    assert stats["Paris"].museum_population_sum == 30
+    assert stats["Lyon"].museum_count == 1
+
+
+@pytest.mark.asyncio
+async def test_import_csv_resumes_after_failure(db_client, tmp_path):
+    path = tmp_path / "museums.csv"
+    rows = ['"Washington, D.C.",1', '"New\nYork",2', "Lyon,3", "Paris,4", "Nice,-5"]
+    path.write_text("city,population\n" + "\n".join(rows) + "\nRome,6\n")
+
+    with pytest.raises(ValueError, match="Invalid museum"):
+        await import_museums(db_client.engine, path, uuid4(), batch_size=2)
+    # The batches before the invalid row are committed with their checkpoint
+    assert await count_museums(db_client) == 4
+
+    # Fixed in place, same size
+    path.write_text(path.read_text().replace("Nice,-5", "Nice,05"))
+    report = await import_museums(db_client.engine, path, uuid4(), batch_size=2)
+    assert (report.rows, report.total_rows) == (2, 6)
+    assert await count_museums(db_client) == 6
+
+    async with async_sessionmaker(db_client.engine)() as session:
+        stats = {
+            row.city: row for row in await city_stats_repo.list_city_stats(session)
+        }
+    assert set(stats) == {
+        "Washington, D.C.",
+        "New\nYork",
+        "Lyon",
+        "Paris",
+        "Nice",
+        "Rome",
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_refuses_to_resume_a_changed_file(db_client, tmp_path):
+    path = tmp_path / "museums.jsonl"
+    path.write_text('{"city": "Paris", "population": 10}\n')
+    await import_museums(db_client.engine, path, uuid4())
+
+    path.write_text(
+        '{"city": "Paris", "population": 10}\n{"city": "Lyon", "population": 5}\n'
+    )
+    with pytest.raises(ValueError, match="--restart"):
+        await import_museums(db_client.engine, path, uuid4())
+
+    report = await import_museums(db_client.engine, path, uuid4(), restart=True)
+    assert (report.rows, report.total_rows) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_import_parquet(db_client, tmp_path, monkeypatch):
+    monkeypatch.setattr("clients.museum_import.PARQUET_SLICE_ROWS", 3)
+    path = tmp_path / "museums.parquet"
+    pl.DataFrame(
+        {"city": [f"City {i % 4}" for i in range(10)], "population": list(range(10))}
+    ).write_parquet(path)
+
+    report = await import_museums(db_client.engine, path, uuid4(), batch_size=4)
+    assert (report.rows, report.total_rows) == (10, 10)
+    assert await count_museums(db_client) == 10
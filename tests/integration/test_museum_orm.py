@@ -29,3 +29,92 @@ async def test_list_museums(db_session):
     cities = {m.city.name for m in museums}
     assert "Paris" in cities
     assert "London" in cities
+
+
+@pytest.mark.asyncio
+async def test_list_museums_after_cursor(db_session):
+    created = []
+    for population in (1, 2, 3):
+        data = MuseumCreateFactory.build(city="Paris", population=population)
+        created.append(await museum_repo.create_museum(db_session, data, uuid4()))
+    await db_session.commit()
+
+    page = await museum_repo.list_museums(db_session, limit=2)
+    assert [m.id for m in page] == [m.id for m in created[:2]]
+
+    page = await museum_repo.list_museums(db_session, limit=2, after=page[-1].id)
+    assert [m.id for m in page] == [created[2].id]
+
+
+@pytest.mark.asyncio
+async def test_create_museums(db_session):
+    existing = MuseumCreateFactory.build(city="Paris", population=1)
+    paris = await museum_repo.create_museum(db_session, existing, uuid4())
+    await db_session.commit()
+
+    data = [
+        MuseumCreateFactory.build(city="Paris", population=2),
+        MuseumCreateFactory.build(city="Lyon", population=3),
+    ]
+    museums = await museum_repo.create_museums(db_session, data, uuid4())
+    await db_session.commit()
+
+    assert [(m.city.name, m.population) for m in museums] == [
+        ("Paris", 2),
+        ("Lyon", 3),
+    ]
+    assert museums[0].city_id == paris.city_id
+    assert len(await museum_repo.list_museums(db_session)) == 3
+
+
+@pytest.mark.asyncio
+async def test_list_museum_rows_filters(db_session):
+    owner = uuid4()
+    for city, population, user_id in [
+        ("Paris", 10, owner),
+        ("Paris", 30, uuid4()),
+        ("Lyon", 20, owner),
+    ]:
+        data = MuseumCreateFactory.build(city=city, population=population)
+        await museum_repo.create_museum(db_session, data, user_id)
+    await db_session.commit()
+
+    async def populations(**filters):
+        rows = await museum_repo.list_museum_rows(
+            db_session, filters=museum_repo.MuseumFilter(**filters)
+        )
+        return [row.population for row in rows]
+
+    assert await populations(city="Paris") == [10, 30]
+    assert await populations(city="Rome") == []
+    assert await populations(min_population=15, max_population=30) == [30, 20]
+    assert await populations(user_id=owner) == [10, 20]
+    assert await populations(city="Paris", user_id=owner) == [10]
+
+
+@pytest.mark.asyncio
+async def test_list_museum_rows_sorted_pages(db_session):
+    for population in (3, 1, 2, 1):
+        data = MuseumCreateFactory.build(city="Paris", population=population)
+        await museum_repo.create_museum(db_session, data, uuid4())
+    await db_session.commit()
+
+    for order, expected in [
+        (museum_repo.SortOrder.ASC, [1, 1, 2, 3]),
+        (museum_repo.SortOrder.DESC, [3, 2, 1, 1]),
+    ]:
+        seen, after = [], None
+        while True:
+            page = await museum_repo.list_museum_rows(
+                db_session,
+                limit=1,
+                after=after,
+                sort=museum_repo.MuseumSort.POPULATION,
+                order=order,
+            )
+            if not page:
+                break
+            seen.extend(page)
+            after = page[-1].id
+        assert [row.population for row in seen] == expected
+        assert len({row.id for row in seen}) == 4
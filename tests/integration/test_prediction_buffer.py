@@ -0,0 +1,118 @@
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from inference import BatchPredictor
+from orm import city_stats as city_stats_repo
+from orm import museum as museum_repo
+from orm.models.visitor_prediction import VisitorPrediction
+from prediction_buffer import PredictionBuffer
+from tests.factories import MuseumCreateFactory
+
+
+class TenthSession:
+    """Stands in for the ONNX model, predicts a tenth of the population."""
+
+    def __init__(self):
+        self.runs = 0
+
+    def run(self, output_names, inputs):
+        self.runs += 1
+        return [inputs["population"].astype(np.float32) / 10]
+
+
+class HangingPredictor:
+    """Never returns its predictions, like a flush cut short at shutdown."""
+
+    async def predict(self, population: int) -> float:
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+
+@pytest.fixture
+async def museums(db_session):
+    museums = await museum_repo.create_museums(
+        db_session,
+        [
+            MuseumCreateFactory.build(city="Paris", population=1000),
+            MuseumCreateFactory.build(city="Paris", population=2000),
+            MuseumCreateFactory.build(city="Lyon", population=500),
+        ],
+        uuid4(),
+    )
+    await db_session.commit()
+    return museums
+
+
+@pytest.mark.asyncio
+async def test_concurrent_predictions_share_one_write(db_client, db_session, museums):
+    session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
+    model = TenthSession()
+    buffer = PredictionBuffer(session_maker, BatchPredictor(model))
+
+    results = await asyncio.gather(
+        *(buffer.add(museum.id) for museum in museums), buffer.add(uuid4())
+    )
+
+    assert results == [100, 200, 50, None]
+    assert model.runs == 1
+    assert set(await db_session.scalars(select(VisitorPrediction.museum_id))) == {
+        museum.id for museum in museums
+    }
+    stats = {row.city: row for row in await city_stats_repo.list_city_stats(db_session)}
+    assert stats["Paris"].latest_predicted_visitors in (100, 200)
+    assert stats["Lyon"].latest_predicted_visitors == 50
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_predictions(db_client, db_session, museums):
+    session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
+    buffer = PredictionBuffer(
+        session_maker, BatchPredictor(TenthSession()), interval=60
+    )
+
+    adds = asyncio.gather(*(buffer.add(museum.id) for museum in museums))
+    await asyncio.sleep(0)
+    await buffer.close()
+
+    assert await adds == [100, 200, 50]
+    assert (
+        await db_session.scalar(select(func.count()).select_from(VisitorPrediction))
+        == 3
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_write_fails_every_task(db_client, museums):
+    session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
+    buffer = PredictionBuffer(session_maker, BatchPredictor(TenthSession()))
+
+    async with db_client.engine.begin() as conn:
+        table = VisitorPrediction.metadata.tables[VisitorPrediction.__tablename__]
+        await conn.run_sync(table.drop)
+    results = await asyncio.gather(
+        *(buffer.add(museum.id) for museum in museums), return_exceptions=True
+    )
+
+    assert all(isinstance(result, Exception) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_cancels_its_tasks(db_client, museums):
+    session_maker = async_sessionmaker(db_client.engine, expire_on_commit=False)
+    buffer = PredictionBuffer(session_maker, HangingPredictor(), interval=0)
+
+    adds = asyncio.gather(
+        *(buffer.add(museum.id) for museum in museums), return_exceptions=True
+    )
+    while not buffer._flushes:
+        await asyncio.sleep(0.01)
+    for flush in buffer._flushes:
+        flush.cancel()
+
+    results = await asyncio.wait_for(adds, timeout=1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
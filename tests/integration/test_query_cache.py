@@ -0,0 +1,40 @@
+import pytest
+
+from caching.backends import MemoryBackend
+from caching.query_cache import QueryCache
+
+
+def _loader(value: bytes):
+    async def loader() -> bytes:
+        return value
+
+    return loader
+
+
+@pytest.mark.asyncio
+async def test_query_cache_invalidated_on_commit_only(db_session):
+    cache = QueryCache(MemoryBackend(maxsize=10), namespace="test")
+    assert await cache.get_or_set("key", _loader(b"old")) == b"old"
+
+    cache.invalidate_on_commit(db_session)
+    await db_session.rollback()
+    assert await cache.get_or_set("key", _loader(b"new")) == b"old"
+
+    cache.invalidate_on_commit(db_session)
+    await db_session.commit()
+    assert await cache.get_or_set("key", _loader(b"new")) == b"new"
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    await backend.set("a", b"1", ttl=60)
+    await backend.set("b", b"2", ttl=60)
+    await backend.get("a")
+    await backend.set("c", b"3", ttl=60)
+
+    assert await backend.get("a") == b"1"
+    assert await backend.get("b") is None
+
+    await backend.set("d", b"4", ttl=-1)
+    assert await backend.get("d") is None
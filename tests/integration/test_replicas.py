@@ -0,0 +1,139 @@
+import math
+from uuid import uuid4
+
+import pytest
+from advanced_alchemy.base import UUIDv7AuditBase
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app import app, db_config
+from clients.db_client import DBClient
+from clients.db_health import DBState
+from clients.replicas import READ_ENGINE, RoutingSession, primary_reads
+from orm.models.city import City
+from orm.models.museum import Museum
+from orm.models.user import User
+
+
+@pytest.fixture
+async def replica_db_client(postgres_url, db_url):
+    """The test database as the primary, and a database standing in for its
+    replica: same schema, its own rows."""
+    name = f"test_replica_{uuid4().hex}"
+    admin = create_async_engine(postgres_url, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    replica_url = db_url.rsplit("/", 1)[0] + f"/{name}"
+
+    client = DBClient(db_url=db_url, replica_urls=[replica_url])
+    replica_client = DBClient(replica_url)
+    await replica_client.create_all()
+    await replica_client.close()
+    yield client
+
+    await client.close()
+    async with admin.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE "{name}" WITH (FORCE)'))
+    await admin.dispose()
+
+
+async def copy_rows(
+    source: AsyncEngine, target: AsyncEngine, *models: type[UUIDv7AuditBase]
+):
+    """Replay the rows of `models` from the primary onto the replica."""
+    for model in models:
+        table = model.metadata.tables[model.__tablename__]
+        async with source.connect() as conn:
+            rows = (await conn.execute(select(table))).mappings().all()
+        async with target.begin() as conn:
+            await conn.execute(insert(table), [dict(row) for row in rows])
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica(replica_db_client):
+    [replica] = replica_db_client.replicas.replicas
+    await replica_db_client.replicas.measure_lag(replica)
+    assert replica.lag == 0
+    assert replica_db_client.read_engine() is replica.engine
+
+    async with replica.engine.begin() as conn:
+        await conn.execute(insert(User).values(name="Replica", email="r@museum.com"))
+
+    session_maker = async_sessionmaker(
+        replica_db_client.engine, sync_session_class=RoutingSession
+    )
+    async with session_maker() as session:
+        session.info[READ_ENGINE] = replica.engine
+        session.add(User(name="Primary", email="p@museum.com"))
+        await session.commit()
+
+        names = await session.scalars(select(User.name))
+        assert names.all() == ["Replica"]
+
+    async with session_maker() as session:
+        names = await session.scalars(select(User.name))
+        assert names.all() == ["Primary"]
+
+
+@pytest.mark.asyncio
+async def test_primary_reads_skip_the_replica(replica_db_client):
+    [replica] = replica_db_client.replicas.replicas
+    async with replica.engine.begin() as conn:
+        await conn.execute(insert(User).values(name="Replica", email="r@museum.com"))
+
+    session_maker = async_sessionmaker(
+        replica_db_client.engine, sync_session_class=RoutingSession
+    )
+    async with session_maker() as session:
+        session.info[READ_ENGINE] = replica.engine
+        session.add(User(name="Primary", email="p@museum.com"))
+        await session.commit()
+
+        with primary_reads(session):
+            names = await session.scalars(select(User.name))
+            assert names.all() == ["Primary"]
+
+        names = await session.scalars(select(User.name))
+        assert names.all() == ["Replica"]
+
+
+@pytest.mark.asyncio
+async def test_lagging_or_down_replica_falls_back_to_primary(replica_db_client):
+    [replica] = replica_db_client.replicas.replicas
+    replica.lag = math.inf
+    assert replica_db_client.read_engine() is replica_db_client.engine
+
+    replica.lag = 0
+    replica.health.state = DBState.DOWN
+    assert replica_db_client.read_engine() is replica_db_client.engine
+
+
+@pytest.mark.asyncio
+async def test_museum_reads_use_a_caught_up_replica(
+    replica_db_client, db_client, authenticated_test_client, monkeypatch
+):
+    [replica] = replica_db_client.replicas.replicas
+    replica.lag = 0
+    monkeypatch.setattr(db_config, "replicas", replica_db_client.replicas)
+    app.state[db_config.session_maker_app_state_key] = async_sessionmaker(
+        db_client.engine, expire_on_commit=False, sync_session_class=RoutingSession
+    )
+
+    response = await authenticated_test_client.post(
+        "/museums", json={"city": "Paris", "population": 100}
+    )
+    museum_id = response.json()["id"]
+
+    # The replica hasn't replayed the create yet, the primary answers
+    response = await authenticated_test_client.get("/museums")
+    assert [museum["city"] for museum in response.json()["items"]] == ["Paris"]
+    response = await authenticated_test_client.get(f"/museums/{museum_id}")
+    assert response.json()["city"] == "Paris"
+
+    # Caught up, with the city renamed on the replica to tell the reads apart
+    await copy_rows(db_client.engine, replica.engine, User, City, Museum)
+    async with replica.engine.begin() as conn:
+        await conn.execute(update(City).values(name="Replica"))
+
+    response = await authenticated_test_client.get("/museums", params={"limit": 10})
+    assert [museum["city"] for museum in response.json()["items"]] == ["Replica"]
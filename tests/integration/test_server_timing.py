@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import text
+
+import metrics
+import server_timing
+
+
+@pytest.mark.asyncio
+async def test_server_timing_phases(db_session):
+    # Checkouts are timed on the engines the app instruments
+    metrics.instrument_engine(db_session.bind, "test_timing")
+    timings = server_timing.start_request()
+
+    await db_session.execute(text("SELECT 1"))
+    await db_session.execute(text("SELECT 2"))
+    with server_timing.phase("serialize"):
+        pass
+
+    assert set(timings.phases) == {
+        server_timing.DB_CHECKOUT,
+        server_timing.SQL,
+        "serialize",
+    }
+    assert timings.phases[server_timing.SQL].count == 2
+    # The second statement reuses the session's connection
+    assert timings.phases[server_timing.DB_CHECKOUT].count == 1
+    header = timings.to_header(total=0.5)
+    assert "sql;dur=" in header
+    assert header.endswith("total;dur=500.00")
+
+
+def test_phase_without_request_is_a_no_op():
+    assert server_timing.current() is None
+    with server_timing.phase("serialize"):
+        pass
@@ -1,4 +1,6 @@
 import pytest
+from uuid import uuid4
+
 from orm import user as user_repo
 from tests.factories import UserCreateFactory
 
@@ -17,3 +19,22 @@ async def test_user_crud(db_session):
     users = await user_repo.list_users(db_session)
     assert len(users) == 1
 
+
+
+@pytest.mark.asyncio
+async def test_cached_user_invalidated_on_update(db_session):
+    data = UserCreateFactory.build(is_admin=True)
+    created_user = await user_repo.create_user(db_session, data)
+    await db_session.commit()
+
+    cached = await user_repo.get_cached_user(db_session, created_user.id)
+    assert cached is not None and cached.is_admin
+    assert await user_repo.get_cached_user(db_session, created_user.id) is cached
+
+    data.is_admin = False
+    await user_repo.update_user(db_session, created_user.id, data)
+    await db_session.commit()
+
+    cached = await user_repo.get_cached_user(db_session, created_user.id)
+    assert cached is not None and not cached.is_admin
+    assert await user_repo.get_cached_user(db_session, uuid4()) is None
@@ -0,0 +1,33 @@
+import pytest
+from uuid import uuid4
+
+import worker
+
+
+class RecordingWorkerClient:
+    def __init__(self):
+        self.museums = []
+
+    async def create_museum_task(self, *, museum_id: str, city: str) -> str:
+        self.museums.append((museum_id, city))
+        return str(uuid4())
+
+
+@pytest.mark.asyncio
+async def test_batch_retries_only_failed_museums(monkeypatch):
+    museums = [(str(uuid4()), city) for city in ("Paris", "Lyon", "Nice")]
+    saved = []
+
+    async def predict_and_save(museum_id: str, city: str) -> None:
+        if city == "Lyon":
+            raise RuntimeError("prediction failed")
+        saved.append((museum_id, city))
+
+    client = RecordingWorkerClient()
+    monkeypatch.setattr(worker, "_predict_and_save", predict_and_save)
+    monkeypatch.setattr(worker, "worker_client", client)
+
+    await worker.log_museums_created(museums)
+
+    assert saved == [museums[0], museums[2]]
+    assert client.museums == [museums[1]]
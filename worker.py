@@ -1,21 +1,25 @@
 import logging
 import asyncio
-import math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from uuid import UUID
 
-import numpy as np
-from onnxruntime import InferenceSession
+from taskiq import TaskiqEvents, TaskiqState
+from taskiq.middlewares import SimpleRetryMiddleware
 from taskiq_pg.psqlpy import PSQLPyBroker
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from sqlalchemy import select
 
+import metrics
+from inference import BatchPredictor, load_session
+from prediction_buffer import PredictionBuffer
 from settings import settings
 from clients.db_client import DBClient
-from clients.worker_client import WorkerClient
-from orm.models.museum import Museum
-from orm.models.city import City
-from orm.models.visitor_prediction import VisitorPrediction
+from clients.task_metrics import TaskMetricsMiddleware
+from clients.worker_client import (
+    LOG_MUSEUM_CREATED,
+    LOG_MUSEUMS_CREATED,
+    WorkerClient,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,33 +29,66 @@ logging.basicConfig(level=logging.INFO)
 _default_db_client = DBClient(settings.db_url)
 
 # Taskiq broker
-broker = PSQLPyBroker(url=settings.broker_url)
+broker = PSQLPyBroker(dsn=settings.broker_url)
+broker.add_middlewares(
+    TaskMetricsMiddleware(),
+    # A task that raised, e.g. because its prediction couldn't be stored, is
+    # sent again
+    SimpleRetryMiddleware(
+        default_retry_count=settings.WORKER_TASK_ATTEMPTS, default_retry_label=True
+    ),
+)
 worker_client = WorkerClient(broker)
 
 # Session factory for Museum DB
 async_session = async_sessionmaker(_default_db_client.engine, expire_on_commit=False)
 
+# Inference blocks, it runs on its own threads so the event loop keeps serving
+# the other tasks' I/O
+inference_executor = (
+    ThreadPoolExecutor(
+        max_workers=settings.INFERENCE_THREADS, thread_name_prefix="inference"
+    )
+    if settings.INFERENCE_THREADS > 0
+    else None
+)
+
 # Load ONNX model
 model_path = Path("cache/model.onnx")
 session = None
+predictor = None
+prediction_buffer = None
 if not model_path.exists():
     logger.warning(f"Model not found at {model_path}. Prediction will fail.")
 else:
     try:
-        session = InferenceSession(str(model_path))
+        session = load_session(model_path, **settings.onnx_session_options)
         logger.info(f"Loaded ONNX model from {model_path}")
     except Exception as e:
         logger.error(f"Failed to load ONNX model: {e}")
+    else:
+        predictor = BatchPredictor(
+            session,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait=settings.INFERENCE_MAX_WAIT_MS / 1000,
+            executor=inference_executor,
+        )
+        prediction_buffer = PredictionBuffer(
+            async_session,
+            predictor,
+            max_size=settings.PREDICTION_FLUSH_SIZE,
+            interval=settings.PREDICTION_FLUSH_INTERVAL_MS / 1000,
+        )
 
 
-@broker.task(task_name="log_museum_created")
-async def log_museum_created(museum_id: str, city: str) -> None:
+async def _predict_and_save(museum_id: str, city: str) -> None:
+    """Predict the visitors for a new museum and store the prediction."""
     try:
         logger.info(
             f"Worker processing: Museum created in {city} with ID {museum_id}"
         )
 
-        if not session:
+        if not prediction_buffer:
             logger.warning("Skipping prediction: No ONNX session loaded.")
             return
 
@@ -61,52 +98,70 @@ async def log_museum_created(museum_id: str, city: str) -> None:
             logger.error(f"Invalid museum ID: {museum_id}")
             return
 
-        async with async_session() as db:
-            async with db.begin():
-                # Fetch museum to get population
-                result = await db.execute(
-                    select(Museum).where(Museum.id == m_id)
-                )
-                museum = result.scalars().first()
-
-                if not museum:
-                    logger.error(f"Museum {m_id} not found in DB.")
-                    return
-
-                population = museum.population
-
-                # Run Prediction
-                # Input name 'population' matches training script
-                x_input = np.array([[population]], dtype=np.int64)
-                output = session.run(None, {"population": x_input})
-                predicted_visitors = max(0, math.floor(float(output[0][0][0])))
-
-                logger.info(
-                    f"Prediction for {city} (pop: {population}): {predicted_visitors}"
-                )
-
-                # Get or Create City
-                res_city = await db.execute(
-                    select(City).where(City.name == city)
-                )
-                city_obj = res_city.scalars().first()
-
-                if not city_obj:
-                    city_obj = City(name=city, population=population)
-                    db.add(city_obj)
-                    await db.flush()  # Flush to assign ID
-                    logger.info(f"Created new City: {city}")
-
-                # Create VisitorPrediction
-                prediction = VisitorPrediction(
-                    city_id=city_obj.id, predicted_visitors=predicted_visitors
-                )
-                db.add(prediction)
-
-        logger.info(f"Saved prediction for {city}")
+        # Read, predicted and written with the museums of the concurrent tasks
+        predicted_visitors = await prediction_buffer.add(m_id)
+        if predicted_visitors is None:
+            logger.error(f"Museum {m_id} not found in DB.")
+            return
+
+        logger.info(f"Saved prediction for {city}: {predicted_visitors}")
 
     except Exception as e:
         logger.error(f"Error processing job: {e}")
+        # Fail the task so that it is retried, the prediction isn't stored
+        raise
+
+
+@broker.task(task_name=LOG_MUSEUM_CREATED)
+async def log_museum_created(museum_id: str, city: str) -> None:
+    await _predict_and_save(museum_id, city)
+
+
+@broker.task(task_name=LOG_MUSEUMS_CREATED)
+async def log_museums_created(museums: list[tuple[str, str]]) -> None:
+    """Batch variant of `log_museum_created` for bulk imports.
+
+    The museums are processed concurrently so their predictions share batches.
+    Museums that failed are sent again as `log_museum_created` tasks of their
+    own: retrying the whole batch would store the others' predictions twice.
+    """
+    results = await asyncio.gather(
+        *(_predict_and_save(museum_id, city) for museum_id, city in museums),
+        return_exceptions=True,
+    )
+    failed = [
+        museum
+        for museum, result in zip(museums, results)
+        if isinstance(result, BaseException)
+    ]
+    if failed:
+        logger.warning(f"Retrying {len(failed)} of {len(museums)} museums one by one")
+    for museum_id, city in failed:
+        await worker_client.create_museum_task(museum_id=museum_id, city=city)
+
+
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def start_metrics_server(state: TaskiqState) -> None:
+    metrics.instrument_engine(_default_db_client.engine, "worker")
+    state.metrics_server = await metrics.start_http_server(
+        settings.WORKER_METRICS_HOST, settings.WORKER_METRICS_PORT
+    )
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def stop_metrics_server(state: TaskiqState) -> None:
+    state.metrics_server.close()
+    await state.metrics_server.wait_closed()
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def stop_inference(state: TaskiqState) -> None:
+    if prediction_buffer is not None:
+        # Write the predictions still buffered before the DB goes away
+        await prediction_buffer.close()
+    if inference_executor is not None:
+        # Let the batches in flight finish without blocking the loop
+        await asyncio.to_thread(inference_executor.shutdown)
 
 
 async def startup():